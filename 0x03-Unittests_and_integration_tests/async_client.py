@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""An asyncio github org client
+"""
+import asyncio
+from functools import wraps
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+import aiohttp
+
+from client import GithubOrgClient
+
+# Orgs fetched at once by fetch_orgs, also the size of its connection pool
+CONCURRENCY = 20
+
+
+async def async_get_json(session: aiohttp.ClientSession, url: str) -> Dict:
+    """Get JSON from remote URL with an aiohttp session."""
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+async def async_get_json_list(
+    session: aiohttp.ClientSession,
+    url: str,
+    per_page: int = GithubOrgClient.PER_PAGE,
+) -> List:
+    """Every item of a paginated JSON list, like utils.get_json_pages.
+    `per_page` is added to the first page's query string, and the pages
+    are followed through `Link: <...>; rel="next"` headers.
+    """
+    items: List = []
+    next_url: Any = url
+    params: Optional[Dict[str, int]] = {"per_page": per_page}
+    while next_url:
+        async with session.get(next_url, params=params) as response:
+            response.raise_for_status()
+            items.extend(await response.json())
+            next_url = response.links.get("next", {}).get("url")
+        # Next links already carry the query string
+        params = None
+    return items
+
+
+def async_memoize(fn: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """Decorator to memoize a coroutine method.
+    The first call starts a task; concurrent and later calls await that
+    same task, so the request is only made once per instance. A task that
+    fails or is cancelled is forgotten, so the next call retries, and a
+    cancelled caller does not cancel the task the others are awaiting.
+    """
+    attr_name = "_{}".format(fn.__name__)
+
+    @wraps(fn)
+    async def memoized(self):
+        """memoized wraps"""
+        task = getattr(self, attr_name, None)
+        if task is None:
+            task = asyncio.ensure_future(fn(self))
+            setattr(self, attr_name, task)
+
+            def forget_failed(done: asyncio.Future) -> None:
+                if done.cancelled() or done.exception() is not None:
+                    if getattr(self, attr_name, None) is done:
+                        setattr(self, attr_name, None)
+
+            task.add_done_callback(forget_failed)
+        return await asyncio.shield(task)
+
+    return memoized
+
+
+class AsyncGithubOrgClient:
+    """An asyncio Github org client sharing one aiohttp session
+    """
+    ORG_URL = GithubOrgClient.ORG_URL
+
+    def __init__(self, org_name: str, session: aiohttp.ClientSession) -> None:
+        """Init method of AsyncGithubOrgClient"""
+        self._org_name = org_name
+        self._session = session
+
+    @async_memoize
+    async def org(self) -> Dict:
+        """Memoize org"""
+        return await async_get_json(
+            self._session, self.ORG_URL.format(org=self._org_name)
+        )
+
+    async def _public_repos_url(self) -> str:
+        """Public repos URL"""
+        return (await self.org())["repos_url"]
+
+    @async_memoize
+    async def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload, every page of it"""
+        return await async_get_json_list(
+            self._session, await self._public_repos_url()
+        )
+
+    async def public_repos(self, license: str = None) -> List[str]:
+        """Public repos"""
+        json_payload = await self.repos_payload()
+        return [
+            repo["name"] for repo in json_payload
+            if license is None or GithubOrgClient.has_license(repo, license)
+        ]
+
+
+async def fetch_orgs(
+    org_names: Iterable[str],
+    concurrency: int = CONCURRENCY,
+    session: Optional[aiohttp.ClientSession] = None,
+    return_exceptions: bool = False,
+) -> Dict[str, Any]:
+    """Fetch many orgs' metadata and repos concurrently.
+    Parameters
+    ----------
+    org_names: Iterable[str]
+        the orgs to fetch
+    concurrency: int
+        orgs in flight at once; a session is created with a connection
+        pool of that size when none is given
+    session: aiohttp.ClientSession
+        session to share with the clients, left open afterwards
+    return_exceptions: bool
+        map failed orgs to their exception instead of raising the first one
+    Returns a dict of org name to a loaded AsyncGithubOrgClient, whose org
+    and repos payload are already fetched.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+        )
+
+    async def load(org_name: str) -> AsyncGithubOrgClient:
+        async with semaphore:
+            client = AsyncGithubOrgClient(org_name, session)
+            await client.repos_payload()
+            return client
+
+    org_names = list(dict.fromkeys(org_names))
+    tasks = [asyncio.ensure_future(load(org_name)) for org_name in org_names]
+    try:
+        results = await asyncio.gather(
+            *tasks, return_exceptions=return_exceptions
+        )
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        if own_session:
+            await session.close()
+    return dict(zip(org_names, results))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for the github org client utilities.
+
+Run with:
+    python3 benchmarks.py
+
+The client benchmarks replay recorded responses (see replay.py) with a
+simulated latency instead of calling api.github.com.
+"""
+
+import asyncio
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+from unittest.mock import patch
+
+from client import GithubOrgClient
+from fixtures import TEST_PAYLOAD
+from replay import ReplayAdapter, ReplayServer, fixture_recordings, replaying
+from utils import POOL_SIZE, access_nested_map, compile_path, extract_all
+
+# Fixture repos repeated to the size of a large org
+REPOS = TEST_PAYLOAD[0][1] * 400
+PATH = ("license", "key")
+
+
+def bench(cases: Dict[str, Callable[[], object]], number: int = 20) -> None:
+    """Time each case and print it relative to the first one"""
+    baseline = None
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        baseline = baseline or seconds
+        print("{:<40} {:>9.3f} ms  {:>5.2f}x".format(
+            name, seconds * 1000, baseline / seconds
+        ))
+
+
+def access_nested_map_loop() -> list:
+    """Current function called once per repo"""
+    values = []
+    for repo in REPOS:
+        try:
+            values.append(access_nested_map(repo, PATH))
+        except KeyError:
+            values.append(None)
+    return values
+
+
+def compiled_loop() -> list:
+    """Compiled accessor called once per repo"""
+    accessor = compile_path(PATH)
+    values = []
+    for repo in REPOS:
+        try:
+            values.append(accessor(repo))
+        except KeyError:
+            values.append(None)
+    return values
+
+
+def bench_access_nested_map() -> None:
+    """access_nested_map against compiled accessors"""
+    print("access_nested_map over {} repos, path {}".format(len(REPOS), PATH))
+    bench({
+        "access_nested_map": access_nested_map_loop,
+        "compile_path": compiled_loop,
+        "extract_all": lambda: extract_all(REPOS, PATH, None),
+    })
+
+
+# Orgs per client benchmark, and the simulated latency of each response
+ORGS = ["org{}".format(i) for i in range(100)]
+LATENCY = 0.01
+JITTER = 0.005
+
+
+def load_org(org_name: str) -> List[str]:
+    """Fetch one org's metadata and repos with the sync client"""
+    return GithubOrgClient(org_name).public_repos()
+
+
+def sync_orgs() -> None:
+    """One org after the other"""
+    for org_name in ORGS:
+        load_org(org_name)
+
+
+def pooled_orgs() -> None:
+    """Orgs fetched on threads sharing the pooled session"""
+    with ThreadPoolExecutor(max_workers=POOL_SIZE) as executor:
+        list(executor.map(load_org, ORGS))
+
+
+async def async_orgs() -> float:
+    """Seconds taken by fetch_orgs to fetch the orgs from a replay server"""
+    from async_client import AsyncGithubOrgClient, fetch_orgs
+
+    async with ReplayServer(ORGS, LATENCY, JITTER, seed=0) as server:
+        with patch.object(AsyncGithubOrgClient, "ORG_URL", server.org_url):
+            start = time.perf_counter()
+            await fetch_orgs(ORGS)
+            return time.perf_counter() - start
+
+
+def bench_clients() -> None:
+    """Orgs per second of the sync, pooled and async client paths"""
+    print("{} orgs, {:.0f} ms +/- {:.0f} ms latency per response".format(
+        len(ORGS), LATENCY * 1000, JITTER * 1000
+    ))
+    adapter = ReplayAdapter(
+        fixture_recordings(ORGS), LATENCY, JITTER, seed=0
+    )
+    timings = {}
+    with replaying(adapter):
+        for name, fn in (("sync", sync_orgs), ("pooled", pooled_orgs)):
+            start = time.perf_counter()
+            fn()
+            timings[name] = time.perf_counter() - start
+    try:
+        timings["async"] = asyncio.run(async_orgs())
+    except ImportError:
+        print("async path skipped, aiohttp is not installed")
+    for name, seconds in timings.items():
+        print("{:<40} {:>9.1f} orgs/s  {:>5.2f}x".format(
+            name, len(ORGS) / seconds, timings["sync"] / seconds
+        ))
+
+
+if __name__ == "__main__":
+    bench_access_nested_map()
+    print()
+    bench_clients()
@@ -2,57 +2,245 @@
 """A github org client
 """
 from typing import (
+    Any,
+    Callable,
+    Iterator,
     List,
     Dict,
+    Optional,
+    Tuple,
 )
 
 from utils import (
     get_json,
-    access_nested_map,
+    get_json_pages,
+    compile_path,
     memoize,
+    SharedCache,
 )
 
+_license_key = compile_path(("license", "key"))
+
+
+class RepoRecord:
+    """Compact record of the commonly used fields of one repo
+    """
+    __slots__ = (
+        "name",
+        "license_key",
+        "fork",
+        "private",
+        "archived",
+        "size",
+        "language",
+        "default_branch",
+        "stargazers_count",
+        "forks_count",
+    )
+    # Payload paths needed to build a record, in get_json projection form
+    FIELDS = (
+        "name",
+        "license.key",
+        "fork",
+        "private",
+        "archived",
+        "size",
+        "language",
+        "default_branch",
+        "stargazers_count",
+        "forks_count",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        license_key: Optional[str] = None,
+        fork: bool = False,
+        private: bool = False,
+        archived: bool = False,
+        size: int = 0,
+        language: Optional[str] = None,
+        default_branch: Optional[str] = None,
+        stargazers_count: int = 0,
+        forks_count: int = 0,
+    ) -> None:
+        """Init method of RepoRecord"""
+        self.name = name
+        self.license_key = license_key
+        self.fork = fork
+        self.private = private
+        self.archived = archived
+        self.size = size
+        self.language = language
+        self.default_branch = default_branch
+        self.stargazers_count = stargazers_count
+        self.forks_count = forks_count
+
+    @classmethod
+    def from_payload(cls, repo: Dict[str, Any]) -> "RepoRecord":
+        """Build a record from one repo of a (full or projected) payload"""
+        try:
+            license_key = _license_key(repo)
+        except KeyError:
+            license_key = None
+        get = repo.get
+        return cls(
+            repo["name"],
+            license_key,
+            get("fork", False),
+            get("private", False),
+            get("archived", False),
+            get("size", 0),
+            get("language"),
+            get("default_branch"),
+            get("stargazers_count", 0),
+            get("forks_count", 0),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the record's fields"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RepoRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return "RepoRecord(name={!r}, license_key={!r})".format(
+            self.name, self.license_key
+        )
+
 
 class GithubOrgClient:
     """A Githib org client
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
+    # Fields kept from each repo of the repos payload; None keeps them all
+    REPO_FIELDS: Optional[Tuple[str, ...]] = RepoRecord.FIELDS
+    # Set to a SharedCache to share fetched payloads between instances
+    shared_cache: Optional[SharedCache] = None
+    # Page size requested when listing repos (GitHub's maximum)
+    PER_PAGE = 100
 
     def __init__(self, org_name: str) -> None:
         """Init method of GithubOrgClient"""
         self._org_name = org_name
 
+    def _shared(
+        self, url: str, fields: Optional[Tuple[str, ...]], fetch: Callable
+    ) -> Any:
+        """Result of fetch, through the shared cache when one is set"""
+        if self.shared_cache is None:
+            return fetch()
+        return self.shared_cache.get((self._org_name, url, fields), fetch)
+
+    def _get_json(
+        self, url: str, fields: Optional[Tuple[str, ...]] = None
+    ) -> Dict:
+        """get_json, through the shared cache when one is set"""
+        def fetch() -> Dict:
+            if fields is None:
+                return get_json(url)
+            return get_json(url, fields=fields)
+
+        return self._shared(url, fields, fetch)
+
+    def _get_json_list(
+        self, url: str, fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Dict]:
+        """Every item of a paginated JSON list, across all its pages"""
+        def fetch() -> List[Dict]:
+            pages = get_json_pages(url, self.PER_PAGE, fields=fields)
+            return [item for page in pages for item in page]
+
+        return self._shared(url, fields, fetch)
+
     @memoize
     def org(self) -> Dict:
         """Memoize org"""
-        return get_json(self.ORG_URL.format(org=self._org_name))
+        return self._get_json(self.ORG_URL.format(org=self._org_name))
 
     @property
     def _public_repos_url(self) -> str:
         """Public repos URL"""
         return self.org["repos_url"]
 
+    def _fetch_repos(self) -> List[Dict]:
+        """Every repo of the org, projected onto REPO_FIELDS"""
+        return self._get_json_list(self._public_repos_url, self.REPO_FIELDS)
+
+    @memoize
+    def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload, every page of it
+
+        Only kept once read; public_repos works from `repos` alone. Each
+        repo is projected onto REPO_FIELDS; set REPO_FIELDS to None on a
+        subclass to keep the full payload instead.
+        """
+        return self._fetch_repos()
+
     @memoize
-    def repos_payload(self) -> Dict:
-        """Memoize repos payload"""
-        return get_json(self._public_repos_url)
+    def repos(self) -> List[RepoRecord]:
+        """Memoize compact repo records
+
+        Built from repos_payload when it is already loaded, otherwise from
+        a fetch whose payload is dropped once the records exist.
+        """
+        payload = type(self).repos_payload.cached(self)
+        if payload is None:
+            payload = self._fetch_repos()
+        return [RepoRecord.from_payload(repo) for repo in payload]
+
+    @memoize
+    def _license_index(self) -> Dict[str, List[str]]:
+        """Memoize repo names grouped by license key"""
+        index: Dict[str, List[str]] = {}
+        for repo in self.repos:
+            if repo.license_key is not None:
+                index.setdefault(repo.license_key, []).append(repo.name)
+        return index
+
+    def refresh(self) -> None:
+        """Forget the org and repos data and everything derived from it
+
+        The next read fetches them again. Payloads shared through
+        shared_cache are still served from it until its own ttl expires.
+        """
+        cls = type(self)
+        for memoized in (
+            cls.org, cls.repos_payload, cls.repos, cls._license_index
+        ):
+            memoized.invalidate(self)
 
     def public_repos(self, license: str = None) -> List[str]:
         """Public repos"""
-        json_payload = self.repos_payload
-        public_repos = [
-            repo["name"] for repo in json_payload
-            if license is None or self.has_license(repo, license)
-        ]
+        if license is not None:
+            return list(self._license_index.get(license, []))
+        return [repo.name for repo in self.repos]
+
+    def iter_repos(
+        self, per_page: int = 100, prefetch: bool = False
+    ) -> Iterator[Dict]:
+        """Stream every repo of the org, following Link pagination"""
+        pages = get_json_pages(
+            self._public_repos_url, per_page, prefetch, self.REPO_FIELDS
+        )
+        for page in pages:
+            yield from page
 
-        return public_repos
+    def iter_public_repos(self, license: str = None) -> Iterator[str]:
+        """Stream public repo names across all pages"""
+        for repo in self.iter_repos():
+            if license is None or self.has_license(repo, license):
+                yield repo["name"]
 
     @staticmethod
     def has_license(repo: Dict[str, Dict], license_key: str) -> bool:
         """Static: has_license"""
         assert license_key is not None, "license_key cannot be None"
         try:
-            has_license = access_nested_map(repo, ("license", "key")) == license_key
+            has_license = _license_key(repo) == license_key
         except KeyError:
             return False
         return has_license
\ No newline at end of file
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Export the repos of many orgs as newline-delimited JSON chunks.
+
+Run with:
+    python3 export_orgs.py google abc --out inventory/
+    python3 export_orgs.py --orgs-file orgs.txt --out inventory/ --no-gzip
+
+Orgs are fetched concurrently, page by page, and each org's records are
+staged to its own file. A single writer appends finished orgs to the
+current chunk (`repos-00000.ndjson.gz.part`), which is renamed once it
+holds `chunk_size` records and listed in `manifest.ndjson` with its
+orgs. Chunks only ever hold whole orgs, so a restart skips the orgs in
+the manifest and drops any unfinished `.part` chunk and staging files.
+Memory use depends on the number of workers, not the number of orgs.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import IO, Dict, Iterable, List, Optional, Set, Tuple
+
+from client import GithubOrgClient, RepoRecord
+from utils import POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Records per chunk before it is closed, at the next org boundary
+CHUNK_SIZE = 10000
+MANIFEST = "manifest.ndjson"
+STAGING = "staging"
+
+
+def _open(path: str, mode: str, compress: bool) -> IO[bytes]:
+    """Open a file for binary writing, gzip-compressed or not."""
+    if compress:
+        return gzip.open(path, mode, compresslevel=6)
+    return open(path, mode)
+
+
+def read_manifest(out_dir: str) -> List[Dict]:
+    """Entries of the manifest, one per completed chunk."""
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as manifest:
+            return [json.loads(line) for line in manifest if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def stage_org(org_name: str, staging_dir: str, compress: bool) -> Tuple[str, int]:
+    """Stream one org's repos into its staging file.
+    Returns the staging file path and the number of records written.
+    """
+    path = os.path.join(
+        staging_dir, org_name + (".ndjson.gz" if compress else ".ndjson")
+    )
+    records = 0
+    with _open(path, "wb", compress) as staged:
+        for repo in GithubOrgClient(org_name).iter_repos():
+            record = RepoRecord.from_payload(repo).to_dict()
+            record["org"] = org_name
+            staged.write(json.dumps(record, separators=(",", ":")).encode())
+            staged.write(b"\n")
+            records += 1
+    return path, records
+
+
+class ChunkWriter:
+    """Appends staged orgs to rolling chunk files and the manifest.
+    Staged files are copied byte for byte: gzip members concatenate into
+    a valid gzip stream, so nothing is decompressed or re-encoded.
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        chunk_size: int = CHUNK_SIZE,
+        compress: bool = True,
+        index: int = 0,
+    ) -> None:
+        """Init method of ChunkWriter"""
+        self.out_dir = out_dir
+        self.chunk_size = chunk_size
+        self.suffix = ".ndjson.gz" if compress else ".ndjson"
+        self.index = index
+        self.records = 0
+        self.orgs: List[str] = []
+        self._chunk: Optional[IO[bytes]] = None
+
+    @property
+    def chunk_name(self) -> str:
+        """File name of the current chunk, once completed"""
+        return "repos-{:05d}{}".format(self.index, self.suffix)
+
+    def add(self, org_name: str, staged_path: str, records: int) -> None:
+        """Append a staged org to the current chunk, rotating when full."""
+        if self._chunk is None:
+            self._chunk = open(
+                os.path.join(self.out_dir, self.chunk_name + ".part"), "wb"
+            )
+        with open(staged_path, "rb") as staged:
+            shutil.copyfileobj(staged, self._chunk)
+        os.remove(staged_path)
+        self.orgs.append(org_name)
+        self.records += records
+        if self.records >= self.chunk_size:
+            self.rotate()
+
+    def rotate(self) -> None:
+        """Complete the current chunk and record its orgs in the manifest."""
+        if self._chunk is None:
+            return
+        self._chunk.flush()
+        os.fsync(self._chunk.fileno())
+        self._chunk.close()
+        self._chunk = None
+        path = os.path.join(self.out_dir, self.chunk_name)
+        os.replace(path + ".part", path)
+        entry = {
+            "chunk": self.chunk_name,
+            "orgs": self.orgs,
+            "records": self.records,
+        }
+        with open(os.path.join(self.out_dir, MANIFEST), "a") as manifest:
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+        self.index += 1
+        self.records = 0
+        self.orgs = []
+
+    def close(self) -> None:
+        """Complete the last, partially filled chunk."""
+        self.rotate()
+
+
+def _clean(out_dir: str, staging_dir: str) -> None:
+    """Remove what an interrupted run left behind."""
+    for name in os.listdir(out_dir):
+        if name.endswith(".part"):
+            os.remove(os.path.join(out_dir, name))
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def export_orgs(
+    org_names: Iterable[str],
+    out_dir: str,
+    workers: int = POOL_SIZE,
+    chunk_size: int = CHUNK_SIZE,
+    compress: bool = True,
+) -> Dict[str, int]:
+    """Export the repos of every org to NDJSON chunks under out_dir.
+    Parameters
+    ----------
+    org_names: Iterable[str]
+        orgs to export; ones already in the manifest are skipped
+    out_dir: str
+        directory of the chunks and the manifest, created if missing
+    workers: int
+        orgs fetched at once
+    chunk_size: int
+        records after which a chunk is closed
+    compress: bool
+        gzip the chunks
+    Orgs that fail are logged and left out of the manifest, so the next
+    run retries them. Returns counts of exported, skipped and failed orgs
+    and of the records written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    staging_dir = os.path.join(out_dir, STAGING)
+    _clean(out_dir, staging_dir)
+    os.makedirs(staging_dir)
+
+    manifest = read_manifest(out_dir)
+    done: Set[str] = {org for entry in manifest for org in entry["orgs"]}
+    writer = ChunkWriter(out_dir, chunk_size, compress, index=len(manifest))
+    summary = {"exported": 0, "skipped": 0, "failed": 0, "records": 0}
+
+    pending_orgs = iter(dict.fromkeys(org_names))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+        while True:
+            for org_name in pending_orgs:
+                if org_name in done:
+                    summary["skipped"] += 1
+                    continue
+                future = executor.submit(
+                    stage_org, org_name, staging_dir, compress
+                )
+                in_flight[future] = org_name
+                if len(in_flight) >= workers:
+                    break
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                org_name = in_flight.pop(future)
+                try:
+                    staged_path, records = future.result()
+                except Exception:
+                    logger.exception("export of org %s failed", org_name)
+                    summary["failed"] += 1
+                    continue
+                writer.add(org_name, staged_path, records)
+                summary["exported"] += 1
+                summary["records"] += records
+    writer.close()
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("orgs", nargs="*", help="orgs to export")
+    parser.add_argument("--orgs-file", help="file with one org per line")
+    parser.add_argument("--out", default="export", help="output directory")
+    parser.add_argument("--workers", type=int, default=POOL_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--no-gzip", action="store_true")
+    args = parser.parse_args(argv)
+
+    org_names = list(args.orgs)
+    if args.orgs_file:
+        with open(args.orgs_file) as orgs_file:
+            org_names.extend(line.strip() for line in orgs_file if line.strip())
+    logging.basicConfig(level=logging.INFO)
+    summary = export_orgs(
+        org_names, args.out, args.workers, args.chunk_size, not args.no_gzip
+    )
+    print("exported {exported} orgs ({records} repos), skipped {skipped}, "
+          "failed {failed}".format(**summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Record/replay transport for get_json, for tests and benchmarks.
+
+`ReplayAdapter` is a requests transport adapter answering from recorded
+responses, optionally recording misses from a real adapter first, and
+`replaying` installs one under `utils.get_json`. `ReplayServer` serves
+the same recordings over HTTP for the aiohttp client. Both can add a
+simulated latency with jitter to every response.
+"""
+import asyncio
+import json
+import random
+import socket
+import time
+from contextlib import contextmanager
+from typing import (
+    IO,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+)
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import utils
+from fixtures import TEST_PAYLOAD
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+GITHUB_URL = "https://api.github.com"
+
+
+class Recording(NamedTuple):
+    """A recorded response"""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+def fixture_recordings(
+    org_names: Iterable[str], base_url: str = GITHUB_URL
+) -> Dict[str, Recording]:
+    """Recordings of the org and repos endpoints for each org.
+    Every org answers with the `TEST_PAYLOAD` org and repos payloads, its
+    `repos_url` pointing at its own repos endpoint under base_url. The
+    repos are recorded both bare and as the first page requested by the
+    paginating sync client (`?per_page=100`).
+    """
+    org_payload, repos_payload = TEST_PAYLOAD[0][0], TEST_PAYLOAD[0][1]
+    headers = {"Content-Type": "application/json; charset=utf-8"}
+    repos_body = json.dumps(repos_payload).encode()
+    recordings = {}
+    for org_name in org_names:
+        org_url = "{}/orgs/{}".format(base_url.rstrip("/"), org_name)
+        org = dict(org_payload, login=org_name, repos_url=org_url + "/repos")
+        recordings[org_url] = Recording(200, headers, json.dumps(org).encode())
+        repos = Recording(200, headers, repos_body)
+        recordings[org["repos_url"]] = repos
+        recordings[org["repos_url"] + "?per_page=100"] = repos
+    return recordings
+
+
+def _delay(latency: float, jitter: float, rng: random.Random) -> float:
+    """A simulated latency: `latency` give or take up to `jitter` seconds."""
+    if jitter:
+        return max(0.0, rng.uniform(latency - jitter, latency + jitter))
+    return latency
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter answering requests from recorded responses.
+    Parameters
+    ----------
+    recordings: Mapping[str, Recording]
+        responses by URL; unknown URLs get a 404
+    latency: float
+        seconds to wait before each response
+    jitter: float
+        up to this many seconds added to or taken off each latency
+    upstream: BaseAdapter
+        adapter to forward unknown URLs to, recording their responses
+    seed: int
+        seed of the jitter, for repeatable runs
+    """
+
+    def __init__(
+        self,
+        recordings: Optional[Mapping[str, Recording]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        upstream: Optional[BaseAdapter] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Init method of ReplayAdapter"""
+        super().__init__()
+        self.recordings = dict(recordings or {})
+        self.latency = latency
+        self.jitter = jitter
+        self.upstream = upstream
+        self.requests = 0
+        self._rng = random.Random(seed)
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs
+    ) -> requests.Response:
+        """Answer a request from the recordings, recording misses first."""
+        self.requests += 1
+        recording = self.recordings.get(request.url)
+        if recording is None and self.upstream is not None:
+            response = self.upstream.send(request, **kwargs)
+            self.recordings[request.url] = Recording(
+                response.status_code, dict(response.headers), response.content
+            )
+            return response
+        if recording is None:
+            recording = Recording(404, {}, b'{"message": "Not Found"}')
+        delay = _delay(self.latency, self.jitter, self._rng)
+        if delay:
+            time.sleep(delay)
+        return self.build_response(request, recording)
+
+    @staticmethod
+    def build_response(
+        request: requests.PreparedRequest, recording: Recording
+    ) -> requests.Response:
+        """Turn a recording into the response to request."""
+        response = requests.Response()
+        response.status_code = recording.status
+        response.headers = CaseInsensitiveDict(recording.headers)
+        response._content = recording.body
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        """Close the upstream adapter, if any."""
+        if self.upstream is not None:
+            self.upstream.close()
+
+    def dump(self, fp: IO[str]) -> None:
+        """Write the recordings to a text file as JSON."""
+        json.dump({
+            url: [rec.status, rec.headers, rec.body.decode("utf-8")]
+            for url, rec in self.recordings.items()
+        }, fp)
+
+    @classmethod
+    def load(cls, fp: IO[str], **kwargs) -> "ReplayAdapter":
+        """Create an adapter replaying recordings written by dump."""
+        recordings = {
+            url: Recording(status, headers, body.encode("utf-8"))
+            for url, (status, headers, body) in json.load(fp).items()
+        }
+        return cls(recordings, **kwargs)
+
+
+@contextmanager
+def replaying(adapter: ReplayAdapter) -> Iterator[requests.Session]:
+    """Serve every get_json request from adapter for the with block.
+    The shared session is swapped for one mounting only the adapter, and
+    restored afterwards; `http_cache` is cleared on the way in and out.
+    """
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    with utils._session_lock:
+        previous, utils._session = utils._session, session
+    utils.http_cache.clear()
+    try:
+        yield session
+    finally:
+        with utils._session_lock:
+            utils._session = previous
+        utils.http_cache.clear()
+        session.close()
+
+
+class ReplayServer:
+    """Local HTTP server answering from recordings, for the async client.
+    Recordings are generated per org by `fixture_recordings` against the
+    server's own URL, so `repos_url` leads back to the server.
+
+    async with ReplayServer(orgs, latency=0.01) as server:
+        ... AsyncGithubOrgClient.ORG_URL = server.org_url ...
+    """
+
+    def __init__(
+        self,
+        org_names: Iterable[str],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Init method of ReplayServer"""
+        if web is None:
+            raise RuntimeError("ReplayServer needs aiohttp installed")
+        self.org_names = list(org_names)
+        self.latency = latency
+        self.jitter = jitter
+        self.recordings: Dict[str, Recording] = {}
+        self.base_url = None
+        self._rng = random.Random(seed)
+        self._runner = None
+
+    @property
+    def org_url(self) -> str:
+        """ORG_URL template pointing at this server"""
+        return self.base_url + "/orgs/{org}"
+
+    async def start(self) -> str:
+        """Start serving on a free local port and return the base URL."""
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.base_url = "http://127.0.0.1:{}".format(sock.getsockname()[1])
+        self.recordings = fixture_recordings(self.org_names, self.base_url)
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.SockSite(self._runner, sock).start()
+        return self.base_url
+
+    async def handle(self, request: "web.Request") -> "web.Response":
+        """Answer with the recording for the request's URL."""
+        recording = self.recordings.get(self.base_url + request.path)
+        delay = _delay(self.latency, self.jitter, self._rng)
+        if delay:
+            await asyncio.sleep(delay)
+        if recording is None:
+            raise web.HTTPNotFound()
+        return web.Response(
+            status=recording.status,
+            body=recording.body,
+            headers=recording.headers,
+        )
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "ReplayServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
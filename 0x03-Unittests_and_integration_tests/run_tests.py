@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Fast test runner: test classes sharded across worker processes.
+
+Run with:
+    python3 run_tests.py            # all test_*.py, one worker per CPU
+    python3 run_tests.py -j 4 test_utils.py --top 10
+
+Each worker loads the fixtures from a marshal cache instead of executing
+fixtures.py, runs its share of the test classes and reports every test's
+duration. Classes are balanced over the workers using the durations of
+the previous run, kept in `.test_timings.json`.
+"""
+import argparse
+import json
+import marshal
+import os
+import sys
+import time
+import types
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures.py")
+FIXTURES_CACHE = os.path.join(HERE, ".fixtures.marshal")
+TIMINGS = os.path.join(HERE, ".test_timings.json")
+
+
+def compile_fixtures() -> None:
+    """Write the fixture data to the marshal cache if it is out of date."""
+    stamp = os.stat(FIXTURES)
+    try:
+        with open(FIXTURES_CACHE, "rb") as cache:
+            if marshal.load(cache) == (stamp.st_mtime_ns, stamp.st_size):
+                return
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    import fixtures
+    data = {
+        name: value for name, value in vars(fixtures).items()
+        if not name.startswith("_") and not isinstance(value, types.ModuleType)
+    }
+    tmp = FIXTURES_CACHE + ".tmp"
+    with open(tmp, "wb") as cache:
+        marshal.dump((stamp.st_mtime_ns, stamp.st_size), cache)
+        marshal.dump(data, cache)
+    os.replace(tmp, FIXTURES_CACHE)
+
+
+def load_fixtures() -> None:
+    """Install the cached fixture data as the `fixtures` module."""
+    with open(FIXTURES_CACHE, "rb") as cache:
+        marshal.load(cache)
+        data = marshal.load(cache)
+    module = types.ModuleType("fixtures")
+    module.__file__ = FIXTURES
+    vars(module).update(data)
+    sys.modules["fixtures"] = module
+
+
+class TimingResult(unittest.TestResult):
+    """Test result recording the duration of each test"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.durations: Dict[str, float] = {}
+        self._started = 0.0
+
+    def startTest(self, test: unittest.TestCase) -> None:
+        super().startTest(test)
+        self._started = time.perf_counter()
+
+    def stopTest(self, test: unittest.TestCase) -> None:
+        self.durations[test.id()] = time.perf_counter() - self._started
+        super().stopTest(test)
+
+
+def run_shard(class_names: List[str]) -> Dict:
+    """Run some test classes in this process and summarise the results."""
+    sys.path.insert(0, HERE)
+    load_fixtures()
+    suite = unittest.defaultTestLoader.loadTestsFromNames(class_names)
+    result = TimingResult()
+    start = time.perf_counter()
+    suite.run(result)
+    return {
+        "run": result.testsRun,
+        "problems": [
+            (kind, test.id(), trace)
+            for kind, problems in (
+                ("FAIL", result.failures), ("ERROR", result.errors)
+            )
+            for test, trace in problems
+        ],
+        "skipped": len(result.skipped),
+        "durations": result.durations,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def test_classes(files: List[str]) -> List[str]:
+    """Dotted names of the test classes in the given test files."""
+    loader = unittest.defaultTestLoader
+    names = []
+    for path in files:
+        module = os.path.splitext(os.path.basename(path))[0]
+        for suite in loader.loadTestsFromName(module):
+            for test in suite:
+                name = "{}.{}".format(module, type(test).__name__)
+                if name not in names:
+                    names.append(name)
+    return names
+
+
+def shard(class_names: List[str], jobs: int) -> List[List[str]]:
+    """Split classes over jobs, longest first onto the least loaded."""
+    try:
+        with open(TIMINGS) as timings_file:
+            timings = json.load(timings_file)
+    except (OSError, ValueError):
+        timings = {}
+    loads = [0.0] * jobs
+    shards: List[List[str]] = [[] for _ in range(jobs)]
+    for name in sorted(class_names, key=lambda n: -timings.get(n, 0.0)):
+        i = loads.index(min(loads))
+        # Unknown classes count as a little work so they spread out
+        loads[i] += timings.get(name, 0.001)
+        shards[i].append(name)
+    return [names for names in shards if names]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="test files (default all)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--top", type=int, default=15,
+                        help="slowest tests to list")
+    args = parser.parse_args(argv)
+
+    os.chdir(HERE)
+    sys.path.insert(0, HERE)
+    start = time.perf_counter()
+    compile_fixtures()
+    load_fixtures()
+    files = args.files or sorted(
+        name for name in os.listdir(HERE)
+        if name.startswith("test_") and name.endswith(".py")
+    )
+    shards = shard(test_classes(files), max(1, args.jobs))
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        results = list(executor.map(run_shard, shards))
+
+    durations: Dict[str, float] = {}
+    for result in results:
+        durations.update(result["durations"])
+    class_times: Dict[str, float] = {}
+    for test_id, seconds in durations.items():
+        class_name = test_id.rsplit(".", 1)[0]
+        class_times[class_name] = class_times.get(class_name, 0.0) + seconds
+    with open(TIMINGS, "w") as timings_file:
+        json.dump(class_times, timings_file, indent=1, sort_keys=True)
+
+    problems = [p for result in results for p in result["problems"]]
+    for kind, test_id, trace in problems:
+        print("=" * 70)
+        print("{}: {}".format(kind, test_id))
+        print("-" * 70)
+        print(trace)
+
+    slowest = sorted(durations.items(), key=lambda item: -item[1])[:args.top]
+    # Wide enough for the longest id, so ids are never cut
+    width = max([70] + [len(test_id) for test_id, _ in slowest])
+    print("{:<{}} {:>8}".format("slowest tests", width, "ms"))
+    for test_id, seconds in slowest:
+        print("{:<{}} {:>8.1f}".format(test_id, width, seconds * 1000))
+    print("shards: {}".format(", ".join(
+        "{:.0f} ms".format(result["seconds"] * 1000) for result in results
+    )))
+    print("Ran {} tests in {:.3f}s on {} workers: {}".format(
+        sum(result["run"] for result in results),
+        time.perf_counter() - start,
+        len(shards),
+        "FAILED ({})".format(len(problems)) if problems else "OK",
+    ))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Unit tests for async_client module"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from async_client import AsyncGithubOrgClient, async_memoize, fetch_orgs
+from fixtures import TEST_PAYLOAD
+
+
+class StubGithub:
+    """Local stand-in for api.github.com serving TEST_PAYLOAD for any org"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.page_sizes = []
+        self.server = None
+
+    async def start(self):
+        """Start the server and return its base URL"""
+        app = web.Application()
+        app.router.add_get("/orgs/{org}", self.org)
+        app.router.add_get("/orgs/{org}/repos", self.repos)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return str(self.server.make_url(""))
+
+    async def org(self, request):
+        """Org payload pointing repos_url back at the stub"""
+        org = request.match_info["org"]
+        if org == "missing":
+            raise web.HTTPNotFound()
+        payload = dict(TEST_PAYLOAD[0][0])
+        payload["repos_url"] = str(self.server.make_url(f"/orgs/{org}/repos"))
+        return await self.respond(payload)
+
+    async def repos(self, request):
+        """Repos payload from the fixtures, over two linked pages"""
+        self.page_sizes.append(request.query.get("per_page"))
+        repos = TEST_PAYLOAD[0][1]
+        half = len(repos) // 2
+        if request.query.get("page") == "2":
+            return await self.respond(repos[half:])
+        next_url = request.url.with_query(
+            per_page=request.query["per_page"], page=2
+        )
+        return await self.respond(
+            repos[:half], {"Link": f'<{next_url}>; rel="next"'}
+        )
+
+    async def respond(self, payload, headers=None):
+        """Answer after the configured delay, tracking concurrency"""
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return web.json_response(payload, headers=headers)
+        finally:
+            self.in_flight -= 1
+
+
+class TestAsyncGithubOrgClient(unittest.IsolatedAsyncioTestCase):
+    """Tests for AsyncGithubOrgClient and fetch_orgs against a stub"""
+
+    async def asyncSetUp(self):
+        """Start the stub and point the client at it"""
+        self.stub = StubGithub(delay=0.01)
+        base_url = await self.stub.start()
+        patcher = patch.object(
+            AsyncGithubOrgClient, "ORG_URL", base_url.rstrip("/") + "/orgs/{org}"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addAsyncCleanup(self.stub.server.close)
+
+    async def test_public_repos(self):
+        """Test that public_repos matches the fixture, with and without license"""
+        results = await fetch_orgs(["google"])
+        client = results["google"]
+
+        self.assertEqual(await client.public_repos(), TEST_PAYLOAD[0][2])
+        self.assertEqual(
+            await client.public_repos(license="apache-2.0"), TEST_PAYLOAD[0][3]
+        )
+        # Both pages requested, at the sync client's page size
+        self.assertEqual(self.stub.page_sizes, ["100", "100"])
+
+    async def test_fetch_orgs_is_bounded(self):
+        """Test that many orgs are fetched with a bounded number in flight"""
+        org_names = [f"org{i}" for i in range(30)]
+        results = await fetch_orgs(org_names, concurrency=5)
+
+        self.assertEqual(list(results), org_names)
+        self.assertLessEqual(self.stub.max_in_flight, 5)
+        self.assertGreater(self.stub.max_in_flight, 1)
+
+    async def test_fetch_orgs_return_exceptions(self):
+        """Test that failed orgs can be reported instead of raised"""
+        results = await fetch_orgs(["google", "missing"], return_exceptions=True)
+
+        self.assertIsInstance(results["google"], AsyncGithubOrgClient)
+        self.assertIsInstance(results["missing"], Exception)
+        with self.assertRaises(Exception):
+            await fetch_orgs(["missing"])
+
+
+class TestAsyncMemoize(unittest.IsolatedAsyncioTestCase):
+    """Tests for async_memoize failure and cancellation handling"""
+
+    class Flaky:
+        """Fails on its first call, then answers after a short delay"""
+
+        def __init__(self):
+            self.calls = 0
+
+        @async_memoize
+        async def value(self):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("transient")
+            await asyncio.sleep(0.01)
+            return self.calls
+
+    async def test_failure_is_not_memoized(self):
+        """Test that a failed call is retried and its success memoized"""
+        obj = self.Flaky()
+        with self.assertRaises(ConnectionError):
+            await obj.value()
+        self.assertEqual(await obj.value(), 2)
+        self.assertEqual(await obj.value(), 2)
+        self.assertEqual(obj.calls, 2)
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that cancelling one awaiting caller leaves the task running"""
+        obj = self.Flaky()
+        obj.calls = 1
+        first = asyncio.ensure_future(obj.value())
+        second = asyncio.ensure_future(obj.value())
+        await asyncio.sleep(0)
+        first.cancel()
+
+        self.assertEqual(await second, 2)
+        self.assertEqual(await obj.value(), 2)
+        self.assertTrue(first.cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
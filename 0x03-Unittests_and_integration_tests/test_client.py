@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Unit tests for client module"""
 
+import json
 import unittest
 from parameterized import parameterized, parameterized_class
 from unittest.mock import patch, Mock, PropertyMock
-from client import GithubOrgClient
+from client import GithubOrgClient, RepoRecord
 from fixtures import TEST_PAYLOAD
+from utils import SharedCache
 
 
 class TestGithubOrgClient(unittest.TestCase):
@@ -31,6 +33,20 @@ class TestGithubOrgClient(unittest.TestCase):
         )
         self.assertEqual(result, test_payload)
 
+    @patch("client.get_json")
+    def test_org_shared_cache(self, mock_get_json):
+        """Test that instances share payloads through shared_cache"""
+        mock_get_json.return_value = {"login": "google"}
+
+        with patch.object(GithubOrgClient, "shared_cache", SharedCache()):
+            first = GithubOrgClient("google").org
+            second = GithubOrgClient("google").org
+
+        mock_get_json.assert_called_once_with(
+            "https://api.github.com/orgs/google"
+        )
+        self.assertIs(first, second)
+
     def test_public_repos_url(self):
         """Test that _public_repos_url returns the expected URL"""
         test_payload = {"repos_url": "https://api.github.com/orgs/test/repos"}
@@ -45,15 +61,17 @@ class TestGithubOrgClient(unittest.TestCase):
 
             self.assertEqual(result, "https://api.github.com/orgs/test/repos")
 
-    @patch("client.get_json")
-    def test_public_repos(self, mock_get_json):
-        """Test that public_repos returns the expected list of repos"""
-        test_payload = [
-            {"name": "repo1", "license": {"key": "mit"}},
-            {"name": "repo2", "license": {"key": "apache-2.0"}},
-            {"name": "repo3", "license": {"key": "gpl"}},
+    @patch("client.get_json_pages")
+    def test_public_repos(self, mock_get_json_pages):
+        """Test that public_repos returns the repos of every page"""
+        # A first page of 30, GitHub's default page size, used to be all
+        # public_repos returned
+        first_page = [
+            {"name": "repo{}".format(i), "license": {"key": "mit"}}
+            for i in range(30)
         ]
-        mock_get_json.return_value = test_payload
+        second_page = [{"name": "repo30", "license": {"key": "gpl"}}]
+        mock_get_json_pages.return_value = iter([first_page, second_page])
 
         with patch(
             "client.GithubOrgClient._public_repos_url",
@@ -65,10 +83,149 @@ class TestGithubOrgClient(unittest.TestCase):
             result = client.public_repos()
 
             mock_url.assert_called_once()
-            mock_get_json.assert_called_once_with(
-                "https://api.github.com/orgs/test/repos"
+            mock_get_json_pages.assert_called_once_with(
+                "https://api.github.com/orgs/test/repos",
+                100,
+                fields=GithubOrgClient.REPO_FIELDS,
             )
-            self.assertEqual(result, ["repo1", "repo2", "repo3"])
+            self.assertEqual(
+                result, ["repo{}".format(i) for i in range(31)]
+            )
+
+    @patch("client.get_json_pages")
+    def test_public_repos_license_index(self, mock_get_json_pages):
+        """Test that license filters are answered from one built index"""
+        mock_get_json_pages.return_value = iter([[
+            {"name": "repo1", "license": {"key": "mit"}},
+            {"name": "repo2", "license": None},
+            {"name": "repo3", "license": {"key": "gpl"}},
+            {"name": "repo4", "license": {"key": "mit"}},
+        ]])
+
+        with patch(
+            "client.GithubOrgClient._public_repos_url",
+            new_callable=PropertyMock,
+            return_value="https://api.github.com/orgs/test/repos",
+        ), patch(
+            "client.GithubOrgClient.has_license"
+        ) as mock_has_license:
+            client = GithubOrgClient("test")
+            self.assertEqual(client.public_repos("mit"), ["repo1", "repo4"])
+            self.assertEqual(client.public_repos("gpl"), ["repo3"])
+            self.assertEqual(client.public_repos("bsd"), [])
+
+        mock_get_json_pages.assert_called_once()
+        mock_has_license.assert_not_called()
+
+    @patch("client.get_json_pages")
+    def test_repos_records(self, mock_get_json_pages):
+        """Test that repos holds compact records and drops the payload"""
+        mock_get_json_pages.return_value = iter([TEST_PAYLOAD[0][1]])
+
+        with patch(
+            "client.GithubOrgClient._public_repos_url",
+            new_callable=PropertyMock,
+            return_value="https://api.github.com/orgs/google/repos",
+        ):
+            client = GithubOrgClient("google")
+            repos = client.repos
+            client.public_repos("mit")
+
+        self.assertEqual([repo.name for repo in repos], TEST_PAYLOAD[0][2])
+        self.assertEqual(repos[0].license_key, "bsd-3-clause")
+        self.assertFalse(hasattr(repos[0], "__dict__"))
+        self.assertIsNone(GithubOrgClient.repos_payload.cached(client))
+        mock_get_json_pages.assert_called_once()
+
+    @patch("client.get_json_pages")
+    def test_repos_from_loaded_payload(self, mock_get_json_pages):
+        """Test that repos reuses a payload that was read explicitly"""
+        mock_get_json_pages.return_value = iter([TEST_PAYLOAD[0][1]])
+
+        with patch(
+            "client.GithubOrgClient._public_repos_url",
+            new_callable=PropertyMock,
+            return_value="https://api.github.com/orgs/google/repos",
+        ):
+            client = GithubOrgClient("google")
+            payload = client.repos_payload
+            repos = client.repos
+
+        self.assertEqual(len(payload), len(repos))
+        self.assertIs(GithubOrgClient.repos_payload.cached(client), payload)
+        mock_get_json_pages.assert_called_once()
+
+    @patch("client.get_json_pages")
+    @patch("client.get_json")
+    def test_refresh(self, mock_get_json, mock_get_json_pages):
+        """Test that refresh drops the org, repos and license index"""
+        mock_get_json.side_effect = [
+            {"repos_url": "https://api.github.com/orgs/test/repos"},
+            {"repos_url": "https://api.github.com/orgs/test/repos2"},
+        ]
+        mock_get_json_pages.side_effect = [
+            iter([[{"name": "old", "license": {"key": "mit"}}]]),
+            iter([[{"name": "new", "license": {"key": "mit"}}]]),
+        ]
+
+        client = GithubOrgClient("test")
+        self.assertEqual(client.public_repos(), ["old"])
+        self.assertEqual(client.public_repos("mit"), ["old"])
+        client.refresh()
+
+        self.assertEqual(client.public_repos(), ["new"])
+        self.assertEqual(client.public_repos("mit"), ["new"])
+        self.assertEqual(
+            mock_get_json_pages.call_args[0][0],
+            "https://api.github.com/orgs/test/repos2",
+        )
+        self.assertEqual(mock_get_json.call_count, 2)
+
+    def test_repo_record_from_payload(self):
+        """Test that records take their fields from a repo payload"""
+        record = RepoRecord.from_payload(TEST_PAYLOAD[0][1][0])
+
+        self.assertEqual(
+            record,
+            RepoRecord(
+                "episodes.dart", "bsd-3-clause", False, False, False, 191,
+                "Dart", "master", 12, 22,
+            ),
+        )
+        self.assertIsNone(RepoRecord.from_payload({"name": "x"}).license_key)
+
+    @parameterized.expand(
+        [
+            (None, ["repo1", "repo2", "repo3"]),
+            ("mit", ["repo1", "repo3"]),
+        ]
+    )
+    @patch("client.get_json_pages")
+    def test_iter_public_repos(self, license, expected, mock_pages):
+        """Test that public repos are streamed across pages"""
+        mock_pages.return_value = iter([
+            [
+                {"name": "repo1", "license": {"key": "mit"}},
+                {"name": "repo2", "license": None},
+            ],
+            [{"name": "repo3", "license": {"key": "mit"}}],
+        ])
+
+        with patch(
+            "client.GithubOrgClient._public_repos_url",
+            new_callable=PropertyMock,
+            return_value="https://api.github.com/orgs/test/repos",
+        ):
+            client = GithubOrgClient("test")
+            result = list(client.iter_public_repos(license))
+
+        mock_pages.assert_called_once_with(
+            "https://api.github.com/orgs/test/repos",
+            100,
+            False,
+            GithubOrgClient.REPO_FIELDS,
+        )
+        self.assertEqual(result, expected)
 
     @parameterized.expand(
         [
@@ -99,21 +256,36 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up test fixtures"""
-        cls.get_patcher = patch("requests.get")
+        # Responses are built once, keyed by the URL the client requests.
+        # The repos are served over two pages linked by a Link header.
+        org_url = GithubOrgClient.ORG_URL.format(org="google")
+        repos_url = cls.org_payload["repos_url"]
+        first_page = repos_url + "?per_page=100"
+        second_page = repos_url + "?per_page=100&page=2"
+        half = len(cls.repos_payload) // 2
+        cls.responses = {
+            org_url: cls.make_response(cls.org_payload),
+            first_page: cls.make_response(
+                cls.repos_payload[:half],
+                {"Link": '<{}>; rel="next"'.format(second_page)},
+            ),
+            second_page: cls.make_response(cls.repos_payload[half:]),
+        }
+        not_found = cls.make_response({})
+
+        cls.get_patcher = patch("requests.Session.get")
         cls.mock_get = cls.get_patcher.start()
+        cls.mock_get.side_effect = (
+            lambda url, **kwargs: cls.responses.get(url, not_found)
+        )
 
-        # Configure the mock to return different payloads based on URL
-        def side_effect(url):
-            mock_response = Mock()
-            if "orgs/google" in url and "repos" not in url:
-                mock_response.json.return_value = cls.org_payload
-            elif "orgs/google/repos" in url:
-                mock_response.json.return_value = cls.repos_payload
-            else:
-                mock_response.json.return_value = {}
-            return mock_response
-
-        cls.mock_get.side_effect = side_effect
+    @staticmethod
+    def make_response(payload, headers=None):
+        """Mock response carrying a JSON payload"""
+        mock_response = Mock(status_code=200, headers=headers or {})
+        mock_response.json.return_value = payload
+        mock_response.content = json.dumps(payload).encode()
+        return mock_response
 
     @classmethod
     def tearDownClass(cls):
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Unit tests for export_orgs module"""
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from export_orgs import export_orgs, read_manifest
+from fixtures import TEST_PAYLOAD
+from replay import ReplayAdapter, fixture_recordings, replaying
+
+ORGS = ["google", "abc", "holberton"]
+
+
+class TestExportOrgs(unittest.TestCase):
+    """Tests for the NDJSON org export"""
+
+    def setUp(self):
+        """Replay the fixtures into a fresh output directory"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out_dir = tmp.name
+        replay = replaying(ReplayAdapter(fixture_recordings(ORGS)))
+        replay.__enter__()
+        self.addCleanup(replay.__exit__, None, None, None)
+
+    def read_chunks(self):
+        """All records of the completed chunks, in order"""
+        records = []
+        for entry in read_manifest(self.out_dir):
+            path = os.path.join(self.out_dir, entry["chunk"])
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rb") as chunk:
+                records.extend(json.loads(line) for line in chunk)
+        return records
+
+    def test_export(self):
+        """Test that every org ends up in closed chunks and the manifest"""
+        summary = export_orgs(ORGS, self.out_dir, workers=2, chunk_size=10)
+
+        self.assertEqual(summary, {
+            "exported": 3, "skipped": 0, "failed": 0, "records": 27,
+        })
+        manifest = read_manifest(self.out_dir)
+        self.assertEqual([entry["records"] for entry in manifest], [18, 9])
+        self.assertEqual(
+            sorted(org for entry in manifest for org in entry["orgs"]),
+            sorted(ORGS),
+        )
+        records = self.read_chunks()
+        self.assertEqual(len(records), 27)
+        self.assertEqual(
+            [r["name"] for r in records if r["org"] == "abc"],
+            TEST_PAYLOAD[0][2],
+        )
+        self.assertEqual(
+            sorted(os.listdir(self.out_dir)),
+            ["manifest.ndjson", "repos-00000.ndjson.gz",
+             "repos-00001.ndjson.gz"],
+        )
+
+    def test_resume(self):
+        """Test that a rerun skips exported orgs and drops partial output"""
+        export_orgs(ORGS[:1], self.out_dir, compress=False)
+        part = os.path.join(self.out_dir, "repos-00001.ndjson.part")
+        with open(part, "w") as partial:
+            partial.write('{"name": "half"}\n')
+
+        summary = export_orgs(ORGS, self.out_dir, compress=False)
+
+        self.assertEqual(
+            (summary["exported"], summary["skipped"]), (2, 1)
+        )
+        self.assertFalse(os.path.exists(part))
+        self.assertEqual(len(self.read_chunks()), 27)
+
+    def test_failed_org_is_retried_later(self):
+        """Test that a failing org is left out of the manifest"""
+        with self.assertLogs("export_orgs", "ERROR"):
+            summary = export_orgs(["google", "missing"], self.out_dir)
+
+        self.assertEqual((summary["exported"], summary["failed"]), (1, 1))
+        self.assertEqual(read_manifest(self.out_dir)[0]["orgs"], ["google"])
+
+
+if __name__ == "__main__":
+    unittest.main()
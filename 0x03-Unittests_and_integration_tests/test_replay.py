@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Unit tests for replay module"""
+
+import io
+import unittest
+from unittest.mock import patch, Mock
+
+from client import GithubOrgClient
+from fixtures import TEST_PAYLOAD
+from replay import (
+    Recording,
+    ReplayAdapter,
+    ReplayServer,
+    fixture_recordings,
+    replaying,
+)
+from utils import get_json
+
+
+class TestReplayAdapter(unittest.TestCase):
+    """Tests for the replay transport under get_json"""
+
+    def test_client_replays_fixtures(self):
+        """Test that GithubOrgClient runs unchanged on fixture recordings"""
+        adapter = ReplayAdapter(fixture_recordings(["google", "abc"]))
+        with replaying(adapter):
+            client = GithubOrgClient("abc")
+            self.assertEqual(client.org["repos_url"],
+                             "https://api.github.com/orgs/abc/repos")
+            self.assertEqual(client.public_repos(), TEST_PAYLOAD[0][2])
+            self.assertEqual(
+                client.public_repos("apache-2.0"), TEST_PAYLOAD[0][3]
+            )
+        self.assertEqual(adapter.requests, 2)
+
+    def test_unknown_url_is_404(self):
+        """Test that a URL without a recording answers 404"""
+        with replaying(ReplayAdapter()) as session:
+            response = session.get("https://api.github.com/orgs/missing")
+        self.assertEqual(response.status_code, 404)
+
+    @patch("replay.time.sleep")
+    def test_latency_and_jitter(self, mock_sleep):
+        """Test that each response waits latency give or take jitter"""
+        adapter = ReplayAdapter(
+            fixture_recordings(["google"]), latency=0.05, jitter=0.02, seed=1
+        )
+        with replaying(adapter):
+            for _ in range(20):
+                get_json("https://api.github.com/orgs/google")
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        self.assertEqual(len(delays), 20)
+        self.assertTrue(all(0.03 <= delay <= 0.07 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_records_and_reloads(self):
+        """Test that misses are recorded from upstream and survive dump/load"""
+        url = "https://api.github.com/orgs/google"
+        upstream = Mock()
+        upstream.send.side_effect = lambda request, **kwargs: (
+            ReplayAdapter.build_response(
+                request, Recording(200, {"ETag": '"v1"'}, b'{"login": "g"}')
+            )
+        )
+        adapter = ReplayAdapter(upstream=upstream)
+        with replaying(adapter):
+            self.assertEqual(get_json(url), {"login": "g"})
+
+        fp = io.StringIO()
+        adapter.dump(fp)
+        fp.seek(0)
+        with replaying(ReplayAdapter.load(fp)):
+            self.assertEqual(get_json(url), {"login": "g"})
+        upstream.send.assert_called_once()
+
+
+class TestReplayServer(unittest.IsolatedAsyncioTestCase):
+    """Tests for the HTTP server replaying recordings"""
+
+    async def test_serves_recordings(self):
+        """Test that org and repos endpoints are served from the fixtures"""
+        from async_client import AsyncGithubOrgClient, fetch_orgs
+
+        async with ReplayServer(["google", "abc"], latency=0.001) as server:
+            with patch.object(AsyncGithubOrgClient, "ORG_URL", server.org_url):
+                results = await fetch_orgs(["google", "abc"])
+        self.assertEqual(
+            await results["abc"].public_repos(), TEST_PAYLOAD[0][2]
+        )
+        self.assertEqual(
+            (await results["abc"].org())["repos_url"],
+            server.base_url + "/orgs/abc/repos",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,26 @@
 #!/usr/bin/env python3
 """Unit tests for utils module"""
 
+import json
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import MappingProxyType
 from parameterized import parameterized
 from unittest.mock import patch, Mock
-from utils import access_nested_map, get_json, memoize
+from fixtures import TEST_PAYLOAD
+import utils
+from utils import (
+    access_nested_map,
+    compile_path,
+    extract_all,
+    get_json,
+    get_json_pages,
+    get_session,
+    memoize,
+    project,
+)
 
 
 class TestAccessNestedMap(unittest.TestCase):
@@ -33,6 +49,49 @@ class TestAccessNestedMap(unittest.TestCase):
             access_nested_map(nested_map, path)
 
 
+class TestCompilePath(unittest.TestCase):
+    """Test cases for compiled path accessors"""
+
+    @parameterized.expand(
+        [
+            ({"a": 1}, ("a",), 1),
+            ({"a": {"b": 2}}, ("a",), {"b": 2}),
+            ({"a": {"b": 2}}, ("a", "b"), 2),
+            ({"a": {"b": {"c": 3}}}, ("a", "b", "c"), 3),
+            ({"a": {"b": {"c": {"d": 4}}}}, ("a", "b", "c", "d"), 4),
+            ({"a": 1}, (), {"a": 1}),
+            ({"a": MappingProxyType({"b": 2})}, ("a", "b"), 2),
+        ]
+    )
+    def test_compile_path(self, nested_map, path, expected):
+        """Test that compiled accessors match access_nested_map"""
+        self.assertEqual(compile_path(path)(nested_map), expected)
+        self.assertEqual(access_nested_map(nested_map, path), expected)
+
+    @parameterized.expand(
+        [
+            ({}, ("a",)),
+            ({"a": 1}, ("a", "b")),
+            ({"a": "xyz"}, ("a", 0)),
+            ({"a": {"b": [1]}}, ("a", "b", 0)),
+            ({"a": {"b": {"c": 1}}}, ("a", "b", "c", "d")),
+        ]
+    )
+    def test_compile_path_exception(self, nested_map, path):
+        """Test that compiled accessors raise KeyError on invalid paths"""
+        with self.assertRaises(KeyError):
+            compile_path(path)(nested_map)
+
+    def test_extract_all(self):
+        """Test batch extraction with and without a default"""
+        repos = [{"license": {"key": "mit"}}, {"license": None}]
+        path = ("license", "key")
+
+        self.assertEqual(extract_all(repos, path, None), ["mit", None])
+        with self.assertRaises(KeyError):
+            extract_all(repos, path)
+
+
 class TestGetJson(unittest.TestCase):
     """Test cases for get_json function"""
 
@@ -42,18 +101,323 @@ class TestGetJson(unittest.TestCase):
             ("http://holberton.io", {"payload": False}),
         ]
     )
-    @patch("utils.requests.get")
-    def test_get_json(self, test_url, test_payload, mock_get):
+    @patch("utils.get_session")
+    def test_get_json(self, test_url, test_payload, mock_get_session):
         """Test that get_json returns expected result"""
         mock_response = Mock()
         mock_response.json.return_value = test_payload
+        mock_get = mock_get_session.return_value.get
         mock_get.return_value = mock_response
 
         result = get_json(test_url)
 
-        mock_get.assert_called_once_with(test_url)
+        mock_get.assert_called_once_with(
+            test_url, headers={}, timeout=utils.TIMEOUT
+        )
         self.assertEqual(result, test_payload)
 
+    def test_get_session_is_shared(self):
+        """Test that the pooled session is built once and reused"""
+        session = get_session()
+        self.assertIs(get_session(), session)
+
+        adapter = session.get_adapter("https://api.github.com")
+        self.assertEqual(adapter._pool_maxsize, utils.POOL_SIZE)
+        self.assertEqual(adapter.max_retries.total, utils.RETRIES)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertNotIn(429, adapter.max_retries.status_forcelist)
+
+
+class TestProjection(unittest.TestCase):
+    """Test cases for projected JSON decoding"""
+
+    @parameterized.expand(
+        [
+            ({"a": 1, "b": 2}, ("a",), {"a": 1}),
+            ({"a": {"b": 1, "c": 2}}, ("a.b",), {"a": {"b": 1}}),
+            ({"a": None}, ("a.b",), {"a": None}),
+            ([{"a": 1, "b": 2}, {"b": 3}], ("a",), [{"a": 1}, {}]),
+        ]
+    )
+    def test_project(self, payload, fields, expected):
+        """Test that only the requested paths are kept"""
+        self.assertEqual(project(payload, fields), expected)
+
+    @patch("utils.get_session")
+    def test_get_json_fields(self, mock_get_session):
+        """Test that get_json decodes the raw body and projects it"""
+        utils.http_cache.clear()
+        self.addCleanup(utils.http_cache.clear)
+        repos = TEST_PAYLOAD[0][1]
+        response = Mock(status_code=200, headers={"ETag": '"v1"'})
+        response.content = json.dumps(repos).encode()
+        mock_get_session.return_value.get.return_value = response
+
+        url = "https://api.github.com/orgs/google/repos"
+        result = get_json(url, fields=("name", "license.key"))
+
+        self.assertEqual(
+            result[0],
+            {"name": "episodes.dart", "license": {"key": "bsd-3-clause"}},
+        )
+        self.assertEqual(len(result), len(repos))
+        response.json.assert_not_called()
+        self.assertIs(
+            utils.http_cache.get((url, ("name", "license.key"))).body, result
+        )
+
+
+class TestHTTPCache(unittest.TestCase):
+    """Test cases for the conditional-request cache under get_json"""
+
+    def setUp(self):
+        """Start every test with an empty cache"""
+        utils.http_cache.clear()
+        self.addCleanup(utils.http_cache.clear)
+
+    @staticmethod
+    def make_response(status, payload=None, headers=None):
+        """Build a mock response with a status, JSON body and headers"""
+        response = Mock(status_code=status, headers=headers or {})
+        response.json.return_value = payload
+        return response
+
+    @patch("utils.get_session")
+    def test_revalidates_and_serves_304_from_cache(self, mock_get_session):
+        """Test that a cached body is revalidated and reused on 304"""
+        url = "https://api.github.com/orgs/google"
+        mock_get = mock_get_session.return_value.get
+        mock_get.side_effect = [
+            self.make_response(200, {"login": "google"}, {"ETag": '"v1"'}),
+            self.make_response(304),
+        ]
+
+        self.assertEqual(get_json(url), {"login": "google"})
+        self.assertEqual(get_json(url), {"login": "google"})
+
+        mock_get.assert_called_with(
+            url, headers={"If-None-Match": '"v1"'}, timeout=utils.TIMEOUT
+        )
+        self.assertEqual(
+            utils.http_cache.stats,
+            {"hits": 1, "misses": 1, "revalidations": 1},
+        )
+
+    @patch("utils.get_session")
+    def test_changed_resource_replaces_entry(self, mock_get_session):
+        """Test that a 200 on revalidation replaces the cached body"""
+        url = "https://api.github.com/orgs/google/repos"
+        mock_get_session.return_value.get.side_effect = [
+            self.make_response(200, ["a"], {"Last-Modified": "Mon"}),
+            self.make_response(200, ["a", "b"], {"Last-Modified": "Tue"}),
+        ]
+
+        get_json(url)
+        self.assertEqual(get_json(url), ["a", "b"])
+        self.assertEqual(utils.http_cache.get(url).last_modified, "Tue")
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = utils.HTTPCache(max_entries=2)
+        for url in ("a", "b"):
+            cache.put(url, utils.CachedResponse(url, url, None))
+        cache.get("a")
+        cache.put("c", utils.CachedResponse("c", "c", None))
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the rate-limit scheduler under get_json"""
+
+    @staticmethod
+    def make_response(status, remaining, reset, payload=None, **headers):
+        """Build a mock response carrying rate-limit headers"""
+        headers.update({
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset),
+        })
+        response = Mock(status_code=status, headers=headers)
+        response.json.return_value = payload
+        return response
+
+    @patch("utils.time.sleep")
+    @patch("utils.time.time", return_value=1000.0)
+    def test_no_wait_with_budget(self, mock_time, mock_sleep):
+        """Test that requests go straight out while the budget is large"""
+        limiter = utils.RateLimiter(reserve=10)
+        limiter.update(self.make_response(200, 4000, 4600))
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+        self.assertEqual(limiter.remaining, 3999)
+
+    @patch("utils.time.time", return_value=1000.0)
+    def test_paces_low_budget(self, mock_time):
+        """Test that a low budget is spread over the rest of the window"""
+        limiter = utils.RateLimiter(reserve=10)
+        limiter.update(self.make_response(200, 5, 1100))
+        limiter.acquire()
+        self.assertEqual(limiter.delay(1000.0), 25.0)
+        limiter.update(self.make_response(200, 0, 1100))
+        self.assertEqual(limiter.delay(1000.0), 100.0)
+        self.assertEqual(limiter.delay(1200.0), 0.0)
+
+    @patch("utils.time.sleep")
+    @patch("utils.time.time", return_value=1000.0)
+    def test_retry_after(self, mock_time, mock_sleep):
+        """Test that a Retry-After rejection is reported and waited out"""
+        limiter = utils.RateLimiter()
+        response = self.make_response(429, 50, 1100, **{"Retry-After": "30"})
+        self.assertTrue(limiter.update(response))
+        self.assertFalse(limiter.update(self.make_response(404, 50, 1100)))
+
+        mock_sleep.side_effect = lambda _: mock_time.configure_mock(
+            return_value=1030.0
+        )
+        limiter.acquire()
+        mock_sleep.assert_called_once_with(30.0)
+        self.assertEqual(limiter.stats["throttled"], 1)
+
+    @patch("utils.get_session")
+    @patch("utils.rate_limiter", new_callable=utils.RateLimiter)
+    def test_get_json_retries_rate_limited(self, limiter, mock_get_session):
+        """Test that get_json queues a rejected request and retries it"""
+        mock_get_session.return_value.get.side_effect = [
+            self.make_response(403, 0, 0),
+            self.make_response(200, 4999, 0, {"login": "google"}),
+        ]
+
+        self.assertEqual(
+            get_json("https://api.github.com/orgs/google"), {"login": "google"}
+        )
+        self.assertEqual(limiter.stats["requests"], 2)
+        self.assertEqual(limiter.stats["throttled"], 1)
+
+    @patch("utils.rate_limiter", new_callable=utils.RateLimiter)
+    def test_429_retried_only_by_limiter(self, limiter):
+        """Test that the adapter leaves 429s to the rate limiter"""
+        statuses = [429, 200]
+        served = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status = statuses.pop(0)
+                served.append(status)
+                body = b'{"login": "google"}'
+                self.send_response(status)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        session = utils._build_session(1, utils.RETRIES, 0)
+        self.addCleanup(session.close)
+
+        with patch("utils.get_session", return_value=session):
+            url = "http://127.0.0.1:{}/orgs/google".format(server.server_port)
+            self.assertEqual(get_json(url), {"login": "google"})
+
+        self.assertEqual(served, [429, 200])
+        # Both attempts went through the limiter's queue
+        self.assertEqual(limiter.stats["requests"], 2)
+        self.assertEqual(limiter.stats["throttled"], 1)
+
+    def test_interrupted_waiter_does_not_block_queue(self):
+        """Test that a caller interrupted while queued gives up its turn"""
+        limiter = utils.RateLimiter()
+        limiter._not_before = time.time() + 1000
+        sleeping, release = threading.Event(), threading.Event()
+
+        def blocking_sleep(_):
+            sleeping.set()
+            release.wait(5)
+            limiter._not_before = 0.0
+
+        with patch("utils.time.sleep", side_effect=blocking_sleep):
+            head = threading.Thread(target=limiter.acquire, daemon=True)
+            head.start()
+            sleeping.wait(5)
+            with patch.object(
+                limiter._cond, "wait", side_effect=KeyboardInterrupt
+            ):
+                with self.assertRaises(KeyboardInterrupt):
+                    limiter.acquire()
+            release.set()
+            head.join(5)
+
+            last = threading.Thread(target=limiter.acquire, daemon=True)
+            last.start()
+            last.join(5)
+        self.assertFalse(last.is_alive())
+        self.assertEqual(limiter.stats["requests"], 2)
+
+    def test_callers_served_in_order(self):
+        """Test that queued callers acquire in arrival order"""
+        limiter = utils.RateLimiter()
+        order = []
+        with limiter._cond:
+            threads = [
+                threading.Thread(
+                    target=lambda i=i: (limiter.acquire(), order.append(i))
+                )
+                for i in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+                while limiter._next_ticket <= threads.index(thread):
+                    limiter._cond.wait(0.01)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, list(range(5)))
+
+
+class TestGetJsonPages(unittest.TestCase):
+    """Test cases for Link-header pagination"""
+
+    def setUp(self):
+        """Serve three linked pages from a mocked session"""
+        utils.http_cache.clear()
+        self.addCleanup(utils.http_cache.clear)
+        base = "https://api.github.com/orgs/google/repos?per_page=2"
+        self.pages = {
+            base: ([1, 2], '<{}&page=2>; rel="next"'.format(base)),
+            base + "&page=2": ([3, 4], '<{}&page=3>; rel="next"'.format(base)),
+            base + "&page=3": ([5], '<{}>; rel="first"'.format(base)),
+        }
+        patcher = patch("utils.get_session")
+        mock_get = patcher.start().return_value.get
+        mock_get.side_effect = self.respond
+        self.addCleanup(patcher.stop)
+
+    def respond(self, url, **kwargs):
+        """Mock response for one page"""
+        body, link = self.pages[url]
+        response = Mock(status_code=200, headers={"Link": link})
+        response.json.return_value = body
+        return response
+
+    @parameterized.expand([(False,), (True,)])
+    def test_follows_next_links(self, prefetch):
+        """Test that every page is yielded in order"""
+        pages = get_json_pages(
+            "https://api.github.com/orgs/google/repos", 2, prefetch
+        )
+        self.assertEqual(list(pages), [[1, 2], [3, 4], [5]])
+
+    def test_pages_are_lazy(self):
+        """Test that later pages are not fetched until needed"""
+        pages = get_json_pages("https://api.github.com/orgs/google/repos", 2)
+        self.assertEqual(next(pages), [1, 2])
+        utils.get_session.return_value.get.assert_called_once()
+
 
 class TestMemoize(unittest.TestCase):
     """Test cases for memoize decorator"""
@@ -87,5 +451,158 @@ class TestMemoize(unittest.TestCase):
             self.assertEqual(result2, 42)
 
 
+class TestSharedCache(unittest.TestCase):
+    """Test cases for the process-wide SharedCache"""
+
+    def setUp(self):
+        """Cache with a 10s TTL and a further 5s stale window"""
+        self.cache = utils.SharedCache(max_entries=2, ttl=10, stale_ttl=5)
+        self.fetch = Mock(side_effect=["v1", "v2"])
+
+    def get_at(self, now, key="k"):
+        """Read key with the clock set to `now`"""
+        with patch("utils.time.monotonic", return_value=now):
+            return self.cache.get(key, self.fetch)
+
+    def test_fresh_value_is_shared(self):
+        """Test that a fresh value is fetched once and then reused"""
+        self.assertEqual(self.get_at(100), "v1")
+        self.assertEqual(self.get_at(109), "v1")
+        self.fetch.assert_called_once()
+
+    def test_stale_value_is_refreshed_in_background(self):
+        """Test that a stale read returns the old value and refreshes it"""
+        self.get_at(100)
+        with patch("utils.threading.Thread") as mock_thread:
+            self.assertEqual(self.get_at(112), "v1")
+        target = mock_thread.call_args.kwargs["target"]
+        target(*mock_thread.call_args.kwargs["args"])
+
+        self.assertEqual(self.cache.get("k", self.fetch), "v2")
+        self.assertEqual(self.cache.stats["refreshes"], 1)
+
+    def test_expired_value_is_fetched(self):
+        """Test that a value past its stale window is fetched again"""
+        self.get_at(100)
+        self.assertEqual(self.get_at(116), "v2")
+
+    def test_lru_eviction(self):
+        """Test that the least recently used key is evicted"""
+        for key in ("a", "b", "c"):
+            self.cache.get(key, lambda: key)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get("a", lambda: "new"), "new")
+
+
+class TestMemoizeOptions(unittest.TestCase):
+    """Test cases for memoize TTL, invalidation, locking and slots"""
+
+    def test_ttl_expiry(self):
+        """Test that a value is recomputed once its TTL has passed"""
+
+        class TestClass:
+            calls = 0
+
+            @memoize(ttl=10)
+            def a_property(self):
+                TestClass.calls += 1
+                return TestClass.calls
+
+        test_obj = TestClass()
+        with patch("utils.time.monotonic", return_value=100.0):
+            self.assertEqual(test_obj.a_property, 1)
+            self.assertEqual(test_obj.a_property, 1)
+        with patch("utils.time.monotonic", return_value=111.0):
+            self.assertEqual(test_obj.a_property, 2)
+        self.assertEqual(
+            TestClass.a_property.cache_info(), {"hits": 1, "misses": 2}
+        )
+
+    def test_invalidate(self):
+        """Test that invalidate forces a recomputation for one instance"""
+
+        class TestClass:
+            def __init__(self):
+                self.calls = 0
+
+            @memoize
+            def a_property(self):
+                self.calls += 1
+                return self.calls
+
+        first, second = TestClass(), TestClass()
+        self.assertEqual((first.a_property, second.a_property), (1, 1))
+        TestClass.a_property.invalidate(first)
+        self.assertEqual((first.a_property, second.a_property), (2, 1))
+
+    def test_cached(self):
+        """Test that cached reads a fresh value without computing one"""
+
+        class TestClass:
+            @memoize(ttl=10)
+            def a_property(self):
+                return 42
+
+        test_obj = TestClass()
+        self.assertIsNone(TestClass.a_property.cached(test_obj))
+        with patch("utils.time.monotonic", return_value=100.0):
+            self.assertEqual(test_obj.a_property, 42)
+            self.assertEqual(TestClass.a_property.cached(test_obj), 42)
+        with patch("utils.time.monotonic", return_value=111.0):
+            self.assertIsNone(TestClass.a_property.cached(test_obj))
+        self.assertEqual(
+            TestClass.a_property.cache_info(), {"hits": 0, "misses": 1}
+        )
+
+    def test_instances_spread_over_locks(self):
+        """Test that same-sized instances do not all share one lock"""
+
+        class TestClass:
+            @memoize
+            def a_property(self):
+                return 42
+
+        objs = [TestClass() for _ in range(100)]
+        locks = {id(TestClass.a_property._lock_for(obj)) for obj in objs}
+        self.assertGreater(len(locks), 16)
+
+    def test_slots(self):
+        """Test that memoize works on a class declaring the cache slot"""
+
+        class TestClass:
+            __slots__ = ("_a_property",)
+
+            @memoize
+            def a_property(self):
+                return 42
+
+        test_obj = TestClass()
+        self.assertEqual(test_obj.a_property, 42)
+        self.assertEqual(test_obj.a_property, 42)
+        with self.assertRaises(AttributeError):
+            test_obj.a_property = 1
+
+    def test_concurrent_first_access(self):
+        """Test that concurrent first reads compute the value only once"""
+        mock_fn = Mock(side_effect=lambda: time.sleep(0.05) or 42)
+
+        class TestClass:
+            @memoize
+            def a_property(self):
+                return mock_fn()
+
+        test_obj = TestClass()
+        threads = [
+            threading.Thread(target=lambda: test_obj.a_property)
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        mock_fn.assert_called_once()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,22 +1,245 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client."""
 
+import json
+import logging
+import threading
+import time
 import requests
-from functools import wraps
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import update_wrapper
+from requests.adapters import HTTPAdapter
+from requests.utils import parse_header_links
 from typing import (
     Mapping,
     Sequence,
     Any,
     Dict,
     Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
 )
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional faster decoder
+    orjson = None
 
 __all__ = [
     "access_nested_map",
+    "compile_path",
+    "extract_all",
     "get_json",
+    "get_json_pages",
+    "get_session",
+    "project",
+    "RateLimiter",
+    "rate_limiter",
+    "configure_session",
+    "HTTPCache",
+    "http_cache",
     "memoize",
+    "MemoizedProperty",
+    "SharedCache",
 ]
 
+# (connect, read) timeout in seconds used by get_json
+TIMEOUT: Union[float, Tuple[float, float]] = (3.05, 10)
+# Defaults for the shared session: keep-alive pool size and retry policy
+POOL_SIZE = 10
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class CachedResponse(NamedTuple):
+    """A decoded JSON body with the validators needed to revalidate it."""
+    body: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+    link: Optional[str] = None
+
+
+class HTTPCache:
+    """Size-bounded LRU of JSON responses, revalidated with 304s.
+    Counters
+    --------
+    hits: responses served from the cache after a 304
+    misses: responses whose body had to be downloaded
+    revalidations: conditional requests sent for a cached URL
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """Init method of HTTPCache"""
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "revalidations": 0}
+        self._entries: "OrderedDict[Any, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[CachedResponse]:
+        """Cached response for a URL (or (URL, fields) projection key)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Any, entry: CachedResponse) -> None:
+        """Store a response, evicting the least recently used ones."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def count(self, counter: str) -> None:
+        """Increment one of the hit/miss/revalidation counters."""
+        with self._lock:
+            self.stats[counter] += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by every get_json call in the process
+http_cache = HTTPCache()
+
+
+def _header_int(headers: Mapping, name: str) -> Optional[int]:
+    """Integer value of a response header, or None when absent/invalid."""
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after(headers: Mapping) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay or HTTP date)."""
+    seconds = _header_int(headers, "Retry-After")
+    if seconds is not None:
+        return float(seconds)
+    value = headers.get("Retry-After")
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Request scheduler following GitHub's rate-limit headers.
+    While more than `reserve` requests remain in the window, requests go
+    out immediately. Below that, they are spaced evenly so the remaining
+    budget lasts until X-RateLimit-Reset; at zero, or after a
+    Retry-After, callers wait. Callers are served in arrival order.
+    """
+
+    def __init__(self, reserve: int = 100) -> None:
+        """Init method of RateLimiter"""
+        self.reserve = reserve
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.stats = {"requests": 0, "throttled": 0, "waited": 0.0}
+        self._not_before = 0.0
+        self._last_sent = 0.0
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        # Tickets finished (served or interrupted) ahead of _serving
+        self._finished: Set[int] = set()
+
+    def delay(self, now: float) -> float:
+        """Seconds the next request has to wait at time `now`."""
+        delay = self._not_before - now
+        if self.remaining is not None and self.reset_at > now:
+            if self.remaining <= 0:
+                delay = max(delay, self.reset_at - now)
+            elif self.remaining <= self.reserve:
+                # Spread what is left evenly over the rest of the window
+                interval = (self.reset_at - self._last_sent) / self.remaining
+                delay = max(delay, self._last_sent + interval - now)
+        return max(0.0, delay)
+
+    def acquire(self) -> None:
+        """Block until the caller may send a request."""
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+        try:
+            with self._cond:
+                while ticket != self._serving:
+                    self._cond.wait()
+            while True:
+                with self._cond:
+                    delay = self.delay(time.time())
+                    if delay <= 0:
+                        self._last_sent = time.time()
+                        if self.remaining is not None:
+                            self.remaining -= 1
+                        self.stats["requests"] += 1
+                        return
+                    self.stats["waited"] += delay
+                time.sleep(delay)
+        finally:
+            # Also reached when interrupted while queued, so the tickets
+            # behind this one are still served
+            with self._cond:
+                self._finished.add(ticket)
+                while self._serving in self._finished:
+                    self._finished.discard(self._serving)
+                    self._serving += 1
+                self._cond.notify_all()
+
+    def update(self, response: requests.Response) -> bool:
+        """Record a response's rate-limit headers.
+        Returns True when the response was a rate-limit rejection that the
+        caller should retry after acquiring again.
+        """
+        headers = response.headers
+        remaining = _header_int(headers, "X-RateLimit-Remaining")
+        reset = _header_int(headers, "X-RateLimit-Reset")
+        retry_after = _retry_after(headers)
+        limited = response.status_code in (403, 429) and (
+            remaining == 0 or retry_after is not None
+        )
+        with self._cond:
+            if remaining is not None and reset is not None:
+                self.remaining = remaining
+                self.reset_at = float(reset)
+            if limited:
+                self.stats["throttled"] += 1
+                if retry_after is not None:
+                    self._not_before = max(
+                        self._not_before, time.time() + retry_after
+                    )
+        return limited
+
+
+# Shared by every get_json call, and so by every GithubOrgClient
+rate_limiter = RateLimiter()
+# Times a rate-limited request is queued and retried before giving up
+RATE_LIMIT_RETRIES = 5
+
 
 def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     """Access nested map with key path.
@@ -40,14 +263,404 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
-def get_json(url: str) -> Dict:
-    """Get JSON from remote URL."""
-    response = requests.get(url)
-    return response.json()
+def compile_path(path: Sequence) -> Callable[[Mapping], Any]:
+    """Compile a key path into an accessor behaving like access_nested_map.
+    The path is unpacked once, and paths of up to three keys get an
+    unrolled accessor. Each level checks `type(value) is dict` before
+    falling back to the slower `isinstance(value, Mapping)` ABC check.
+    Example
+    -------
+    >>> get_license = compile_path(("license", "key"))
+    >>> get_license({"license": {"key": "mit"}})
+    'mit'
+    """
+    keys = tuple(path)
+
+    if len(keys) == 1:
+        (k0,) = keys
+
+        def accessor(nested_map: Mapping) -> Any:
+            if not (type(nested_map) is dict or isinstance(nested_map, Mapping)):
+                raise KeyError(k0)
+            return nested_map[k0]
+
+    elif len(keys) == 2:
+        k0, k1 = keys
+
+        def accessor(nested_map: Mapping) -> Any:
+            if not (type(nested_map) is dict or isinstance(nested_map, Mapping)):
+                raise KeyError(k0)
+            value = nested_map[k0]
+            if not (type(value) is dict or isinstance(value, Mapping)):
+                raise KeyError(k1)
+            return value[k1]
+
+    elif len(keys) == 3:
+        k0, k1, k2 = keys
+
+        def accessor(nested_map: Mapping) -> Any:
+            if not (type(nested_map) is dict or isinstance(nested_map, Mapping)):
+                raise KeyError(k0)
+            value = nested_map[k0]
+            if not (type(value) is dict or isinstance(value, Mapping)):
+                raise KeyError(k1)
+            value = value[k1]
+            if not (type(value) is dict or isinstance(value, Mapping)):
+                raise KeyError(k2)
+            return value[k2]
+
+    else:
+
+        def accessor(nested_map: Mapping) -> Any:
+            for key in keys:
+                if not (type(nested_map) is dict or isinstance(nested_map, Mapping)):
+                    raise KeyError(key)
+                nested_map = nested_map[key]
+            return nested_map
+
+    return accessor
+
+
+_MISSING = object()
+
+
+def extract_all(
+    nested_maps: Iterable[Mapping], path: Sequence, default: Any = _MISSING
+) -> List[Any]:
+    """Extract one path from every map, compiling the path once.
+    Without `default` a missing path raises KeyError like
+    access_nested_map; with it, maps missing the path yield `default`.
+    """
+    accessor = compile_path(path)
+    if default is _MISSING:
+        return [accessor(nested_map) for nested_map in nested_maps]
+    values = []
+    for nested_map in nested_maps:
+        try:
+            values.append(accessor(nested_map))
+        except KeyError:
+            values.append(default)
+    return values
+
+
+class _Retry(Retry):
+    """Adapter retry policy leaving rate-limit rejections to rate_limiter.
+    urllib3 retries any 413/429/503 carrying Retry-After on its own; a 429
+    retried there would skip the limiter's queue and its headers unseen.
+    """
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+
+def _build_session(
+    pool_size: int, retries: int, backoff_factor: float
+) -> requests.Session:
+    """Create a keep-alive session with a sized pool and retrying adapter."""
+    retry = _Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def configure_session(
+    pool_size: int = POOL_SIZE,
+    retries: int = RETRIES,
+    backoff_factor: float = BACKOFF_FACTOR,
+    timeout: Union[float, Tuple[float, float], None] = None,
+) -> requests.Session:
+    """Replace the shared HTTP session used by get_json.
+    Parameters
+    ----------
+    pool_size: int
+        keep-alive connections kept open per host
+    retries: int
+        retries on connection errors and 5xx responses, with exponential
+        backoff and `Retry-After` honoured; rate-limit rejections are
+        retried by `rate_limiter` instead
+    backoff_factor: float
+        base delay in seconds of the exponential backoff
+    timeout: float or (connect, read) tuple
+        new default timeout for get_json, unchanged when None
+    """
+    global _session, TIMEOUT
+    session = _build_session(pool_size, retries, backoff_factor)
+    with _session_lock:
+        previous, _session = _session, session
+        if timeout is not None:
+            TIMEOUT = timeout
+    if previous is not None:
+        previous.close()
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared HTTP session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(POOL_SIZE, RETRIES, BACKOFF_FACTOR)
+    return _session
+
+
+Fields = Optional[Tuple[str, ...]]
 
 
-def memoize(fn: Callable) -> Callable:
+def _field_tree(fields: Sequence[str]) -> Dict:
+    """Turn dotted paths into a nested dict; None marks a kept leaf."""
+    tree: Dict = {}
+    for field in fields:
+        node = tree
+        *parents, leaf = field.split(".")
+        for key in parents:
+            child = node.get(key)
+            if child is None:
+                child = node[key] = {}
+            node = child
+        node[leaf] = None
+    return tree
+
+
+def _project(value: Any, tree: Dict) -> Any:
+    if type(value) is list:
+        return [_project(item, tree) for item in value]
+    if type(value) is not dict:
+        return value
+    projected = {}
+    for key, subtree in tree.items():
+        if key in value:
+            item = value[key]
+            projected[key] = item if subtree is None else _project(item, subtree)
+    return projected
+
+
+def project(payload: Any, fields: Sequence[str]) -> Any:
+    """Keep only the given dotted paths of a decoded JSON payload.
+    Lists are projected item by item and missing paths are skipped.
+    Example
+    -------
+    >>> project([{"name": "a", "license": {"key": "mit", "url": "..."}}],
+    ...         ("name", "license.key"))
+    [{'name': 'a', 'license': {'key': 'mit'}}]
+    """
+    return _project(payload, _field_tree(fields))
+
+
+def _decode(response: requests.Response, fields: Fields) -> Any:
+    """Decode a JSON response, projected onto fields when given.
+    With a projection the raw bytes are decoded with orjson when it is
+    installed, and only the projected values outlive this call.
+    """
+    if fields is None:
+        return response.json()
+    if orjson is not None:
+        payload = orjson.loads(response.content)
+    else:
+        payload = json.loads(response.content)
+    return project(payload, fields)
+
+
+def _fetch(url: str, fields: Fields = None) -> CachedResponse:
+    """Fetch url through the shared session and the revalidation cache."""
+    key = url if fields is None else (url, fields)
+    cached = http_cache.get(key)
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        http_cache.count("revalidations")
+
+    for _ in range(RATE_LIMIT_RETRIES + 1):
+        rate_limiter.acquire()
+        response = get_session().get(url, headers=headers, timeout=TIMEOUT)
+        if not rate_limiter.update(response):
+            break
+    if cached is not None and response.status_code == 304:
+        http_cache.count("hits")
+        return cached
+
+    http_cache.count("misses")
+    fetched = CachedResponse(
+        _decode(response, fields),
+        response.headers.get("ETag"),
+        response.headers.get("Last-Modified"),
+        response.headers.get("Link"),
+    )
+    if response.status_code == 200 and (fetched.etag or fetched.last_modified):
+        http_cache.put(key, fetched)
+    return fetched
+
+
+def get_json(url: str, fields: Optional[Sequence[str]] = None) -> Dict:
+    """Get JSON from remote URL over the shared, pooled session.
+    Responses carrying an ETag or Last-Modified header are kept in
+    `http_cache`; later calls revalidate them with If-None-Match /
+    If-Modified-Since and reuse the cached body on a 304.
+    `fields` is an optional projection of dotted paths (see `project`);
+    only the projected payload is returned and cached.
+    """
+    if fields is None:
+        return _fetch(url).body
+    return _fetch(url, tuple(fields)).body
+
+
+def _next_page_url(link: Optional[str]) -> Optional[str]:
+    """URL of the rel="next" entry of a Link header, if any."""
+    if not link:
+        return None
+    for entry in parse_header_links(link):
+        if entry.get("rel") == "next":
+            return entry.get("url")
+    return None
+
+
+def get_json_pages(
+    url: str,
+    per_page: int = 100,
+    prefetch: bool = False,
+    fields: Optional[Sequence[str]] = None,
+) -> Iterator[List]:
+    """Yield each page of a paginated JSON list.
+    Parameters
+    ----------
+    url: str
+        first page; `per_page` is added to its query string
+    per_page: int
+        page size to request (GitHub allows up to 100)
+    prefetch: bool
+        fetch the next page in a background thread while the caller
+        consumes the current one
+    fields: Sequence[str]
+        optional projection applied to every page, as in get_json
+    Pages are followed through `Link: <...>; rel="next"` headers, so only
+    one page (two when prefetching) is held in memory at a time.
+    """
+    url = requests.Request("GET", url, params={"per_page": per_page}).prepare().url
+    if fields is not None:
+        fields = tuple(fields)
+    if not prefetch:
+        while url:
+            page = _fetch(url, fields)
+            url = _next_page_url(page.link)
+            yield page.body
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(_fetch, url, fields)
+        while pending is not None:
+            page = pending.result()
+            url = _next_page_url(page.link)
+            pending = executor.submit(_fetch, url, fields) if url else None
+            yield page.body
+
+
+class _MemoizedValue:
+    """A memoized result and the monotonic time it expires at."""
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: Optional[float]) -> None:
+        self.value = value
+        self.expires_at = expires_at
+
+    def fresh(self) -> bool:
+        """Whether the value may still be served."""
+        return self.expires_at is None or time.monotonic() < self.expires_at
+
+
+class MemoizedProperty:
+    """Read-only property computing its value once per instance.
+    The value is stored in the `_<name>` attribute of the instance, so
+    classes using `__slots__` only need to declare that slot. Computation
+    happens under a lock, so concurrent first reads call the method once.
+    """
+    # Instances are spread over a fixed set of locks; this works for
+    # __slots__ classes, which cannot be weakly referenced.
+    LOCK_STRIPES = 64
+
+    def __init__(self, fn: Callable, ttl: Optional[float] = None) -> None:
+        """Init method of MemoizedProperty"""
+        self.fn = fn
+        self.ttl = ttl
+        self.attr_name = "_{}".format(fn.__name__)
+        self.stats = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        self._locks = [threading.RLock() for _ in range(self.LOCK_STRIPES)]
+        update_wrapper(self, fn)
+
+    def __get__(self, obj: Any, objtype: type = None) -> Any:
+        if obj is None:
+            return self
+        entry = getattr(obj, self.attr_name, None)
+        if entry is None or not entry.fresh():
+            with self._lock_for(obj):
+                entry = getattr(obj, self.attr_name, None)
+                if entry is None or not entry.fresh():
+                    expires_at = None
+                    if self.ttl is not None:
+                        expires_at = time.monotonic() + self.ttl
+                    entry = _MemoizedValue(self.fn(obj), expires_at)
+                    setattr(obj, self.attr_name, entry)
+                    self._count("misses")
+                    return entry.value
+        self._count("hits")
+        return entry.value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        raise AttributeError("can't set attribute")
+
+    def cached(self, obj: Any) -> Any:
+        """The fresh value memoized on obj, or None; never computes it."""
+        entry = getattr(obj, self.attr_name, None)
+        if entry is None or not entry.fresh():
+            return None
+        return entry.value
+
+    def invalidate(self, obj: Any) -> None:
+        """Forget the value memoized on obj; the next read recomputes it."""
+        with self._lock_for(obj):
+            if getattr(obj, self.attr_name, None) is not None:
+                setattr(obj, self.attr_name, None)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Hit and miss counts across all instances."""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            self.stats[counter] += 1
+
+    def _lock_for(self, obj: Any) -> threading.RLock:
+        # Addresses are aligned, so id() is hashed before picking a stripe;
+        # id(obj) % LOCK_STRIPES puts same-sized instances on one lock.
+        return self._locks[hash((id(obj),)) % self.LOCK_STRIPES]
+
+
+def memoize(
+    fn: Optional[Callable] = None, *, ttl: Optional[float] = None
+) -> Any:
     """Decorator to memoize a method.
+    Parameters
+    ----------
+    ttl: float
+        seconds each instance keeps its value before recomputing it;
+        None (the default) keeps it until invalidated
     Example
     -------
     class MyClass:
@@ -61,14 +674,116 @@ def memoize(fn: Callable) -> Callable:
     42
     >>> my_object.a_method
     42
+    >>> MyClass.a_method.invalidate(my_object)
+    >>> my_object.a_method
+    a_method called
+    42
+    """
+    if fn is None:
+        return lambda fn: MemoizedProperty(fn, ttl)
+    return MemoizedProperty(fn, ttl)
+
+
+class SharedCache:
+    """Process-wide LRU cache with TTL and stale-while-revalidate.
+    Parameters
+    ----------
+    max_entries: int
+        entries kept before the least recently used is evicted
+    ttl: float
+        seconds a value is served without any refresh
+    stale_ttl: float
+        further seconds a value is still served while a background
+        thread refreshes it; after that a read fetches synchronously
     """
-    attr_name = "_{}".format(fn.__name__)
+    LOCK_STRIPES = 64
+
+    def __init__(
+        self, max_entries: int = 1024, ttl: float = 300.0, stale_ttl: float = 60.0
+    ) -> None:
+        """Init method of SharedCache"""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self._fetch_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def get(self, key: Any, fetch: Callable[[], Any]) -> Any:
+        """Return the value for key, calling fetch() when it is missing."""
+        entry = self._lookup(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self._count("hits")
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._refresh_in_background(key, fetch)
+                return entry[1]
+
+        # Concurrent misses for one key wait for a single fetch
+        with self._fetch_locks[hash(key) % self.LOCK_STRIPES]:
+            entry = self._lookup(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._count("hits")
+                return entry[1]
+            self._count("misses")
+            value = fetch()
+            self._store(key, value)
+            return value
+
+    def invalidate(self, key: Any) -> None:
+        """Drop one entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Any) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.stats[counter] += 1
 
-    @wraps(fn)
-    def memoized(self):
-        """ "memoized wraps"""
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
-        return getattr(self, attr_name)
+    def _refresh_in_background(self, key: Any, fetch: Callable[[], Any]) -> None:
+        """Start one refresh thread per key, unless one is running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(
+            target=self._refresh, args=(key, fetch), daemon=True
+        ).start()
 
-    return property(memoized)
+    def _refresh(self, key: Any, fetch: Callable[[], Any]) -> None:
+        try:
+            self._store(key, fetch())
+            self._count("refreshes")
+        except Exception:
+            # Keep serving the stale value; the next read retries
+            logger.warning("background refresh of %r failed", key, exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
@@ -37,3 +37,11 @@ class Message(models.Model):
     )
     message_body = models.TextField()
     sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Backs the (sent_at, message_id) ordering of MessageCursorPagination
+        indexes = [
+            models.Index(
+                fields=["sent_at", "message_id"], name="message_sent_at_id_idx"
+            )
+        ]
@@ -1,7 +1,98 @@
-from rest_framework.pagination import PageNumberPagination
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class MessageCursorPagination(CursorPagination):
+    """Newest-first message pages addressed by an opaque cursor.
+
+    DRF's CursorPagination only seeks on the first ordering field and
+    steps over ties with an OFFSET (capped at offset_cutoff). Here the
+    cursor holds the full (sent_at, message_id) key of the page edge and
+    pages seek past it on the matching index, so ties never need an
+    OFFSET and deep pages cost the same as the first one.
+    """
+
+    ordering = ("-sent_at", "-message_id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = None if self.cursor is None else self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by("sent_at", "message_id")
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek(position, reverse))
+
+        # One extra row tells whether there is a page beyond this one
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def seek(self, position, reverse):
+        """Filter for the rows after (or, reversed, before) a position"""
+        try:
+            sent_at, message_id = position.split("|")
+            sent_at = datetime.fromisoformat(sent_at)
+            message_id = uuid.UUID(message_id)
+        except (AttributeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # The sent_at bound alone lets the index range start at the cursor
+        if reverse:
+            return Q(sent_at__gte=sent_at) & (
+                Q(sent_at__gt=sent_at) | Q(message_id__gt=message_id)
+            )
+        return Q(sent_at__lte=sent_at) & (
+            Q(sent_at__lt=sent_at) | Q(message_id__lt=message_id)
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        return f"{instance.sent_at.isoformat()}|{instance.message_id}"
@@ -17,9 +17,37 @@ class MessageSerializer(serializers.ModelSerializer):
 
 
 class ConversationSerializer(serializers.ModelSerializer):
+    # Messages previewed per conversation; the full history is paginated
+    # by MessageViewSet
+    LATEST_MESSAGES = 20
+
     participants = UserSerializer(many=True)
-    messages = MessageSerializer(many=True, read_only=True)
+    latest_messages = serializers.SerializerMethodField()
+    message_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Conversation
-        fields = ["conversation_id", "participants", "messages", "created_at"]
+        fields = [
+            "conversation_id",
+            "participants",
+            "latest_messages",
+            "message_count",
+            "created_at",
+        ]
+
+    def get_latest_messages(self, conversation):
+        # Prefetched by ConversationViewSet; queried here otherwise
+        messages = getattr(conversation, "latest_messages", None)
+        if messages is None:
+            messages = reversed(
+                conversation.messages.select_related("sender").order_by(
+                    "-sent_at", "-message_id"
+                )[: self.LATEST_MESSAGES]
+            )
+        return MessageSerializer(messages, many=True, context=self.context).data
+
+    def get_message_count(self, conversation):
+        count = getattr(conversation, "message_count", None)
+        if count is None:
+            count = conversation.messages.count()
+        return count
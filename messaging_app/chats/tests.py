@@ -1,3 +1,252 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Conversation, Message, User
+from .serializers import ConversationSerializer, UserSerializer
+
+
+class ConversationQueryCountTests(APITestCase):
+    """Listing conversations costs the same number of queries at any size"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="alice")
+        self.client.force_authenticate(self.user)
+
+    def create_conversations(self, count, messages=3):
+        for _ in range(count):
+            other = User.objects.create(username=f"user{User.objects.count()}")
+            conversation = Conversation.objects.create()
+            conversation.participants.add(self.user, other)
+            for i in range(messages):
+                message = Message.objects.create(
+                    sender=other if i % 2 else self.user,
+                    conversation=conversation,
+                    message_body=f"message {i}",
+                )
+                # sent_at is auto_now_add; space the messages out explicitly
+                Message.objects.filter(pk=message.pk).update(
+                    sent_at=message.sent_at + timedelta(seconds=i)
+                )
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/conversations/")
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_list_query_count_is_constant(self):
+        self.create_conversations(2)
+        few, _ = self.list_queries()
+        self.create_conversations(10)
+        many, body = self.list_queries()
+
+        self.assertEqual(few, many)
+        # count, conversations, participants, latest messages with senders
+        self.assertEqual(many, 4)
+        self.assertEqual(body["count"], 12)
+
+    def test_messages_are_ordered_with_senders(self):
+        self.create_conversations(1, messages=4)
+        _, body = self.list_queries()
+
+        messages = body["results"][0]["latest_messages"]
+        self.assertEqual(
+            [m["message_body"] for m in messages],
+            [f"message {i}" for i in range(4)],
+        )
+        self.assertEqual(messages[0]["sender"]["username"], "alice")
+
+    def test_only_own_conversations_are_listed(self):
+        self.create_conversations(2)
+        other = User.objects.create(username="mallory")
+        Conversation.objects.create().participants.add(other)
+
+        _, body = self.list_queries()
+
+        self.assertEqual(body["count"], 2)
+
+    def test_conversations_are_ordered(self):
+        self.create_conversations(3)
+        # Newest first, ties broken by conversation_id
+        newest = Conversation.objects.order_by("conversation_id").first()
+        Conversation.objects.exclude(pk=newest.pk).update(
+            created_at=newest.created_at - timedelta(days=1)
+        )
+        Conversation.objects.filter(pk=newest.pk).update(
+            created_at=newest.created_at + timedelta(days=1)
+        )
+
+        _, body = self.list_queries()
+
+        others = sorted(
+            str(pk)
+            for pk in Conversation.objects.exclude(pk=newest.pk)
+            .values_list("conversation_id", flat=True)
+        )
+        self.assertEqual(
+            [c["conversation_id"] for c in body["results"]],
+            [str(newest.pk)] + others,
+        )
+
+    def test_latest_messages_are_bounded(self):
+        limit = ConversationSerializer.LATEST_MESSAGES
+        self.create_conversations(2, messages=limit + 5)
+
+        _, body = self.list_queries()
+
+        for conversation in body["results"]:
+            self.assertEqual(conversation["message_count"], limit + 5)
+            self.assertEqual(
+                [m["message_body"] for m in conversation["latest_messages"]],
+                [f"message {i}" for i in range(5, limit + 5)],
+            )
+
+    def test_latest_messages_break_sent_at_ties(self):
+        limit = ConversationSerializer.LATEST_MESSAGES
+        self.create_conversations(1, messages=limit + 5)
+        # Messages sent in the same instant are ordered by message_id
+        Message.objects.update(sent_at=timezone.now())
+        expected = [
+            m.message_body
+            for m in Message.objects.order_by("sent_at", "message_id")
+        ][-limit:]
+
+        _, body = self.list_queries()
+        data = ConversationSerializer(Conversation.objects.get()).data
+
+        prefetched = body["results"][0]["latest_messages"]
+        for messages in (prefetched, data["latest_messages"]):
+            self.assertEqual([m["message_body"] for m in messages], expected)
+
+    def test_serializer_without_prefetch(self):
+        limit = ConversationSerializer.LATEST_MESSAGES
+        self.create_conversations(1, messages=limit + 1)
+
+        data = ConversationSerializer(Conversation.objects.get()).data
+
+        self.assertEqual(data["message_count"], limit + 1)
+        self.assertEqual(len(data["latest_messages"]), limit)
+        self.assertEqual(data["latest_messages"][0]["message_body"], "message 1")
+
+
+class MessageQueryCountTests(APITestCase):
+    """Listing messages costs the same number of queries at any size"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="alice")
+        self.client.force_authenticate(self.user)
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.user)
+
+    def create_messages(self, count):
+        for _ in range(count):
+            sender = User.objects.create(username=f"user{User.objects.count()}")
+            self.conversation.participants.add(sender)
+            Message.objects.create(
+                sender=sender, conversation=self.conversation, message_body="hi"
+            )
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/messages/?page_size=100")
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_list_query_count_is_constant(self):
+        self.create_messages(3)
+        few, _ = self.list_queries()
+        self.create_messages(30)
+        many, body = self.list_queries()
+
+        self.assertEqual(few, many)
+        # messages with senders; cursor pages are not counted
+        self.assertEqual(many, 1)
+        self.assertEqual(len(body["results"]), 33)
+        self.assertEqual(
+            list(body["results"][0]["sender"]), UserSerializer.Meta.fields
+        )
+
+    def test_only_own_messages_are_listed(self):
+        self.create_messages(2)
+        other = Conversation.objects.create()
+        Message.objects.create(
+            sender=User.objects.create(username="mallory"),
+            conversation=other,
+            message_body="secret",
+        )
+
+        _, body = self.list_queries()
+
+        self.assertEqual(len(body["results"]), 2)
+
+
+class MessagePaginationTests(APITestCase):
+    """Messages are paged newest first by an opaque cursor"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="alice")
+        self.client.force_authenticate(self.user)
+        conversation = Conversation.objects.create()
+        conversation.participants.add(self.user)
+        Message.objects.bulk_create(
+            Message(sender=self.user, conversation=conversation, message_body=str(i))
+            for i in range(45)
+        )
+        # Ties on sent_at are broken by message_id
+        now = timezone.now()
+        Message.objects.filter(message_body__in=["0", "1", "2"]).update(sent_at=now)
+
+    def expected_ids(self):
+        expected = Message.objects.order_by("-sent_at", "-message_id")
+        return [str(pk) for pk in expected.values_list("pk", flat=True)]
+
+    def walk(self, url, link="next"):
+        """Follow `link` from url, returning the pages' message ids"""
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(queries), 1)
+            sql = queries[0]["sql"].upper()
+            self.assertNotIn("COUNT", sql)
+            self.assertNotIn("OFFSET", sql)
+            body = response.json()
+            self.assertNotIn("count", body)
+            pages.append([message["message_id"] for message in body["results"]])
+            url = body[link]
+        return pages, body
+
+    def test_pages_cover_every_message_once(self):
+        pages, _ = self.walk("/api/messages/")
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(sum(pages, []), self.expected_ids())
+
+    def test_tied_timestamps_are_seeked_by_message_id(self):
+        # Every message sent in the same instant, across every page
+        Message.objects.update(sent_at=timezone.now())
+
+        pages, last = self.walk("/api/messages/?page_size=10")
+
+        self.assertEqual(len(pages), 5)
+        self.assertEqual(sum(pages, []), self.expected_ids())
+        # And back again through the previous links
+        back, _ = self.walk(last["previous"], link="previous")
+        self.assertEqual(back, pages[-2::-1])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/messages/?cursor=bogus")
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_size(self):
+        response = self.client.get("/api/messages/?page_size=5")
+        self.assertEqual(len(response.json()["results"]), 5)
+        self.assertIn("cursor=", response.json()["next"])
+
+        response = self.client.get("/api/messages/?page_size=1000")
+        self.assertEqual(len(response.json()["results"]), 45)
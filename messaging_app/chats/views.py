@@ -1,11 +1,13 @@
+from django.db.models import Count, F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from rest_framework import viewsets, status, filters
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Conversation, Message
-from .serializers import ConversationSerializer, MessageSerializer
+from .serializers import ConversationSerializer, MessageSerializer, UserSerializer
 from .permissions import IsParticipantOfConversation
 from .filters import MessageFilter
-from .pagination import StandardResultsSetPagination
+from .pagination import MessageCursorPagination
 
 
 class ConversationViewSet(viewsets.ModelViewSet):
@@ -14,7 +16,32 @@ class ConversationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsParticipantOfConversation]
 
     def get_queryset(self):
-        return Conversation.objects.filter(participants=self.request.user)
+        # Participants and the latest messages (with their senders) are
+        # fetched in one query each, however many conversations are listed
+        # and however long they are
+        latest = (
+            Message.objects.select_related("sender")
+            .annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=F("conversation_id"),
+                    order_by=[F("sent_at").desc(), F("message_id").desc()],
+                )
+            )
+            .filter(position__lte=ConversationSerializer.LATEST_MESSAGES)
+            .order_by("sent_at", "message_id")
+        )
+        return (
+            Conversation.objects.filter(participants=self.request.user)
+            .distinct()
+            .annotate(message_count=Count("messages", distinct=True))
+            # Pages need a total order; newest conversations first
+            .order_by("-created_at", "conversation_id")
+            .prefetch_related(
+                "participants",
+                Prefetch("messages", queryset=latest, to_attr="latest_messages"),
+            )
+        )
 
 
 class MessageViewSet(viewsets.ModelViewSet):
@@ -23,8 +50,21 @@ class MessageViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsParticipantOfConversation]
     filter_backends = [DjangoFilterBackend]
     filterset_class = MessageFilter
-    pagination_class = StandardResultsSetPagination
+    pagination_class = MessageCursorPagination
 
     def get_queryset(self):
-        # Only return messages where user is a participant
-        return Message.objects.filter(conversation__participants=self.request.user)
+        # Only return messages where user is a participant. The subquery
+        # keeps one row per message, and senders are joined with just the
+        # columns MessageSerializer renders.
+        conversations = Conversation.objects.filter(participants=self.request.user)
+        return (
+            Message.objects.filter(conversation__in=conversations)
+            .select_related("sender")
+            .only(
+                "message_id",
+                "message_body",
+                "sent_at",
+                "conversation_id",
+                *(f"sender__{field}" for field in UserSerializer.Meta.fields),
+            )
+        )
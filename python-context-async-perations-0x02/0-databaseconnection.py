@@ -4,20 +4,32 @@ Task 0: Custom class-based context manager for Database connection
 """
 
 import sqlite3
+import time
+
+from query_stats import TimedCursor
 
 
 class DatabaseConnection:
-    """Custom context manager for database connections"""
+    """Custom context manager for database connections
+
+    Pass a query_stats.QueryStats as `stats` to record connect, execute and
+    fetch timings for every query run on the returned cursor.
+    """
 
-    def __init__(self, db_path="users.db"):
+    def __init__(self, db_path="users.db", stats=None):
         self.db_path = db_path
+        self.stats = stats
         self.connection = None
         self.cursor = None
 
     def __enter__(self):
         """Enter the context - open connection"""
+        start = time.perf_counter()
         self.connection = sqlite3.connect(self.db_path)
         self.cursor = self.connection.cursor()
+        if self.stats is not None:
+            self.stats.record_connect(time.perf_counter() - start)
+            self.cursor = TimedCursor(self.cursor, self.stats)
         return self.cursor
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -8,78 +8,94 @@ managing both connection and the query execution.
 
 import sqlite3
 
+from query_engine import SyncQueryEngine
+
 
 class ExecuteQuery:
-    """Reusable context manager for executing queries"""
+    """Reusable context manager for executing queries
+
+    Queries run on a query_engine.SyncQueryEngine, so they share its
+    pooling, read caching (`cache_ttl` seconds) and instrumentation. Pass a
+    running SyncQueryEngine as `engine` to share its pool, cache and stats
+    across blocks; it is left open on exit. Otherwise each block starts its
+    own engine on `db_path`, closed on exit. Pass a query_stats.QueryStats
+    as `stats` to record connect, execute and fetch timings for every query
+    run through execute_query, and an index_advisor.IndexAdvisor as
+    `advisor` to collect its WHERE predicates.
+    """
 
-    def __init__(self, db_path="users.db"):
+    def __init__(self, db_path="users.db", stats=None, advisor=None, cache_ttl=0,
+                 engine=None):
         self.db_path = db_path
-        self.connection = None
-        self.cursor = None
+        self.stats = stats
+        self.advisor = advisor
+        self.cache_ttl = cache_ttl
+        self.engine = engine
+        self.owns_engine = engine is None
         self.results = None
 
     def __enter__(self):
-        """Enter the context - open connection"""
-        self.connection = sqlite3.connect(self.db_path)
-        self.cursor = self.connection.cursor()
+        """Enter the context - start an engine unless one was given"""
+        if self.owns_engine:
+            self.engine = SyncQueryEngine(
+                self.db_path, pool_size=1, cache_ttl=self.cache_ttl, stats=self.stats
+            )
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Exit the context - close connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
+        """Exit the context - close the engine if this block started it"""
+        if self.owns_engine and self.engine:
+            self.engine.close()
+            self.engine = None
 
     def execute_query(self, query, params=None):
         """Execute the query and store results"""
-        if params:
-            self.cursor.execute(query, params)
-        else:
-            self.cursor.execute(query)
-        self.results = self.cursor.fetchall()
+        if self.advisor is not None:
+            self.advisor.observe(query)
+        self.results = self.engine.execute_query(query, params)
         return self.results
 
 
-# Create sample database with age column
-conn = sqlite3.connect("users.db")
-cursor = conn.cursor()
+if __name__ == "__main__":
+    # Create sample database with age column
+    conn = sqlite3.connect("users.db")
+    cursor = conn.cursor()
+
+    # Create users table with age column
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            email TEXT,
+            age INTEGER
+        )
+    """)
 
-# Create users table with age column
-cursor.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY,
-        name TEXT,
-        email TEXT,
-        age INTEGER
+    # Insert sample data with ages
+    cursor.execute(
+        "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (1, 'John Doe', 'john@example.com', 25)"
+    )
+    cursor.execute(
+        "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (2, 'Jane Smith', 'jane@example.com', 30)"
+    )
+    cursor.execute(
+        "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (3, 'Bob Johnson', 'bob@example.com', 45)"
     )
-""")
-
-# Insert sample data with ages
-cursor.execute(
-    "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (1, 'John Doe', 'john@example.com', 25)"
-)
-cursor.execute(
-    "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (2, 'Jane Smith', 'jane@example.com', 30)"
-)
-cursor.execute(
-    "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (3, 'Bob Johnson', 'bob@example.com', 45)"
-)
-cursor.execute(
-    "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (4, 'Alice Brown', 'alice@example.com', 28)"
-)
-cursor.execute(
-    "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (5, 'Charlie Wilson', 'charlie@example.com', 50)"
-)
-
-conn.commit()
-conn.close()
-
-# Use ExecuteQuery context manager with the specified query and parameter
-with ExecuteQuery() as executor:
-    query = "SELECT * FROM users WHERE age > ?"
-    parameter = 25
-    results = executor.execute_query(query, (parameter,))
-    print("Query results:")
-    for row in results:
-        print(row)
+    cursor.execute(
+        "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (4, 'Alice Brown', 'alice@example.com', 28)"
+    )
+    cursor.execute(
+        "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (5, 'Charlie Wilson', 'charlie@example.com', 50)"
+    )
+
+    conn.commit()
+    conn.close()
+
+    # Use ExecuteQuery context manager with the specified query and parameter
+    with ExecuteQuery() as executor:
+        query = "SELECT * FROM users WHERE age > ?"
+        parameter = 25
+        results = executor.execute_query(query, (parameter,))
+        print("Query results:")
+        for row in results:
+            print(row)
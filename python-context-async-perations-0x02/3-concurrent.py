@@ -6,14 +6,22 @@ Run multiple database queries concurrently using asyncio.gather.
 """
 
 import asyncio
-import aiosqlite
+import inspect
 import sqlite3
 
+from query_engine import QueryEngine
+
+DB_PATH = "concurrent_users.db"
+
+# Upper bound on queries in flight at once, and per-query timeout in seconds
+MAX_CONCURRENT_QUERIES = 10
+QUERY_TIMEOUT = 5.0
+
 
 # Create sample database with age column
 def create_sample_db():
     """Create sample database for async operations"""
-    conn = sqlite3.connect("concurrent_users.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     # Create users table with age column
@@ -47,45 +55,111 @@ def create_sample_db():
     conn.close()
 
 
-async def async_fetch_users():
+def _close_unstarted(aw):
+    """Close a coroutine that was cancelled before it ever ran"""
+    if inspect.iscoroutine(aw):
+        if inspect.getcoroutinestate(aw) == inspect.CORO_CREATED:
+            aw.close()
+
+
+def _bounded_tasks(aws, limit, timeout):
+    """Wrap awaitables in tasks that hold a semaphore slot while running"""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        try:
+            async with semaphore:
+                return await asyncio.wait_for(aw, timeout)
+        finally:
+            _close_unstarted(aw)
+
+    return [asyncio.ensure_future(run(aw)) for aw in aws]
+
+
+async def _cancel_all(tasks):
+    """Cancel the given tasks and wait for them to finish"""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def gather_bounded(*aws, limit=MAX_CONCURRENT_QUERIES, timeout=QUERY_TIMEOUT):
+    """Like asyncio.gather, but with at most `limit` awaitables in flight.
+
+    Each awaitable gets its own `timeout` (None disables it). If any of them
+    fails, the siblings still running or waiting for a slot are cancelled and
+    the first exception is raised. Results keep the order of `aws`.
+    """
+    tasks = _bounded_tasks(aws, limit, timeout)
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        await _cancel_all(tasks)
+        raise
+
+
+async def as_completed_bounded(aws, limit=MAX_CONCURRENT_QUERIES, timeout=QUERY_TIMEOUT):
+    """Yield results of `aws` as they complete, with at most `limit` in flight.
+
+    Stopping the iteration early, or a failing awaitable, cancels the rest.
+    """
+    tasks = _bounded_tasks(aws, limit, timeout)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        await _cancel_all(tasks)
+
+
+async def _fetchall(engine, query, params=()):
+    """Run a read on engine, or on a short-lived engine when none is given"""
+    if engine is not None:
+        return await engine.fetchall(query, params)
+    async with QueryEngine(DB_PATH, pool_size=1) as engine:
+        return await engine.fetchall(query, params)
+
+
+async def async_fetch_users(engine=None):
     """Fetch all users from database"""
-    async with aiosqlite.connect("concurrent_users.db") as db:
-        async with db.execute("SELECT * FROM users") as cursor:
-            results = await cursor.fetchall()
-            print("All users fetched:")
-            for row in results:
-                print(row)
-            return results
+    results = await _fetchall(engine, "SELECT * FROM users")
+    print("All users fetched:")
+    for row in results:
+        print(row)
+    return results
 
 
-async def async_fetch_older_users():
+async def async_fetch_older_users(engine=None):
     """Fetch users older than 40"""
-    async with aiosqlite.connect("concurrent_users.db") as db:
-        async with db.execute("SELECT * FROM users WHERE age > ?", (40,)) as cursor:
-            results = await cursor.fetchall()
-            print("Users older than 40:")
-            for row in results:
-                print(row)
-            return results
+    results = await _fetchall(engine, "SELECT * FROM users WHERE age > ?", (40,))
+    print("Users older than 40:")
+    for row in results:
+        print(row)
+    return results
 
 
 async def fetch_concurrently():
-    """Use asyncio.gather to execute both queries concurrently"""
+    """Use a bounded gather to execute both queries concurrently"""
     print("Running concurrent async database queries:")
     print("-" * 40)
 
-    # Execute both queries concurrently using asyncio.gather
-    results = await asyncio.gather(async_fetch_users(), async_fetch_older_users())
+    # Execute both queries concurrently, never more than the limit at once,
+    # on one engine so identical reads share a pooled connection and result
+    async with QueryEngine(DB_PATH, pool_size=MAX_CONCURRENT_QUERIES) as engine:
+        results = await gather_bounded(
+            async_fetch_users(engine), async_fetch_older_users(engine)
+        )
 
     print("\nConcurrent execution complete!")
     print(f"Total users: {len(results[0])}")
     print(f"Users older than 40: {len(results[1])}")
+    print(f"Query stats: {engine.flight.stats}")
 
     return results
 
 
-# Create sample database
-create_sample_db()
+if __name__ == "__main__":
+    # Create sample database
+    create_sample_db()
 
-# Run the concurrent fetch using asyncio.run
-asyncio.run(fetch_concurrently())
+    # Run the concurrent fetch using asyncio.run
+    asyncio.run(fetch_concurrently())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Task 4: Multi-process Sharded Reads
+
+Split a read over a table into rowid ranges and decode each range in its
+own worker process, so large reads are not limited to a single core.
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+
+def read_only_connection(db_path):
+    """Open a read-only connection using a sqlite URI"""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+
+def read_shard(db_path, query, params):
+    """Worker: run one rowid range and return its rows as a pickled batch"""
+    connection = read_only_connection(db_path)
+    try:
+        return connection.execute(query, params).fetchall()
+    finally:
+        connection.close()
+
+
+class ShardedQuery:
+    """Run a SELECT over a table in parallel, one rowid range per worker.
+
+    Rows come back in rowid order, exactly as a single
+    `SELECT ... ORDER BY rowid` would return them. Table and column names
+    are inserted into the SQL as-is, so they must not come from user input.
+    """
+
+    def __init__(self, db_path="users.db", table="users", workers=None):
+        self.db_path = db_path
+        self.table = table
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+
+    def __enter__(self):
+        """Enter the context - start the worker processes"""
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit the context - shut the worker processes down"""
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+    def rowid_ranges(self, shards):
+        """Split the table's rowid span into `shards` inclusive ranges"""
+        connection = read_only_connection(self.db_path)
+        try:
+            low, high = connection.execute(
+                f"SELECT MIN(rowid), MAX(rowid) FROM {self.table}"
+            ).fetchone()
+        finally:
+            connection.close()
+        if low is None:
+            return []
+        step = max(1, -(-(high - low + 1) // shards))
+        return [
+            (start, min(start + step - 1, high))
+            for start in range(low, high + 1, step)
+        ]
+
+    def execute_query(self, where=None, params=(), columns="*", shards=None):
+        """Run `SELECT columns FROM table WHERE where` across the workers"""
+        shards = shards or self.workers
+        query = (
+            f"SELECT {columns} FROM {self.table} "
+            "WHERE rowid BETWEEN ? AND ?"
+        )
+        if where:
+            query += f" AND ({where})"
+        query += " ORDER BY rowid"
+
+        ranges = self.rowid_ranges(shards)
+        batches = self.executor.map(
+            read_shard,
+            [self.db_path] * len(ranges),
+            [query] * len(ranges),
+            [(low, high, *params) for low, high in ranges],
+        )
+        # map() yields in submission order, so chaining keeps rowid order
+        return list(chain.from_iterable(batches))
+
+
+if __name__ == "__main__":
+    # Reads the users.db seeded by 0-databaseconnection.py / 1-execute.py
+    with ShardedQuery(workers=4) as sharded:
+        results = sharded.execute_query("age > ?", (25,))
+        print("Query results:")
+        for row in results:
+            print(row)
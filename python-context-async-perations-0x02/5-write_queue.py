@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Task 5: Async Write-behind Queue
+
+Producers submit writes without waiting on their own transaction; a single
+writer task groups them into one transaction per batch (group commit).
+"""
+
+import asyncio
+import aiosqlite
+
+
+class WriteQueue:
+    """Async context manager that batches writes into shared transactions.
+
+    A batch is committed once `max_batch` writes are queued or `max_delay`
+    seconds have passed since its first write, whichever comes first. Each
+    write runs inside its own savepoint, so a failing statement only fails
+    its own future and the rest of the batch still commits.
+    """
+
+    def __init__(self, db_path="users.db", max_batch=100, max_delay=0.05):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.connection = None
+        self.queue = None
+        self.writer = None
+        self.stats = {"writes": 0, "failed": 0, "transactions": 0}
+
+    async def __aenter__(self):
+        """Enter the context - open the connection and start the writer"""
+        # Autocommit mode so transactions are controlled explicitly below
+        self.connection = await aiosqlite.connect(self.db_path, isolation_level=None)
+        self.queue = asyncio.Queue()
+        self.writer = asyncio.ensure_future(self._run_writer())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Exit the context - flush pending writes and close the connection"""
+        await self.queue.put(None)
+        await self.writer
+        await self.connection.close()
+
+    def submit(self, query, params=()):
+        """Queue a write; the returned future resolves once it is committed"""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((query, params, future))
+        return future
+
+    async def _next_batch(self):
+        """Wait for a first write, then collect more until size or deadline"""
+        item = await self.queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                # Put the stop marker back so the loop ends after this batch
+                self.queue.put_nowait(None)
+                break
+            batch.append(item)
+        return batch
+
+    async def _run_writer(self):
+        """Commit batches until the stop marker is seen"""
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                return
+            await self._commit(batch)
+
+    async def _commit(self, batch):
+        """Apply one batch in a single transaction and settle its futures"""
+        results = []
+        try:
+            await self.connection.execute("BEGIN")
+            for query, params, future in batch:
+                await self.connection.execute("SAVEPOINT write")
+                try:
+                    cursor = await self.connection.execute(query, params)
+                except Exception as exc:
+                    await self.connection.execute("ROLLBACK TO write")
+                    results.append((future, None, exc))
+                else:
+                    results.append((future, cursor.rowcount, None))
+                await self.connection.execute("RELEASE write")
+            await self.connection.execute("COMMIT")
+        except Exception as exc:
+            if self.connection.in_transaction:
+                await self.connection.execute("ROLLBACK")
+            self.stats["failed"] += len(batch)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        failed = sum(1 for _, _, exc in results if exc is not None)
+        self.stats["writes"] += len(results) - failed
+        self.stats["failed"] += failed
+        self.stats["transactions"] += 1
+        for future, rowcount, exc in results:
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(rowcount)
+
+
+async def seed_users():
+    """Seed the users table through the write queue"""
+    users = [
+        (1, "John Doe", "john@example.com", 25),
+        (2, "Jane Smith", "jane@example.com", 30),
+        (3, "Bob Johnson", "bob@example.com", 45),
+        (4, "Alice Brown", "alice@example.com", 28),
+        (5, "Charlie Wilson", "charlie@example.com", 50),
+    ]
+    async with WriteQueue() as writes:
+        await writes.submit("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                email TEXT,
+                age INTEGER
+            )
+        """)
+        pending = [
+            writes.submit(
+                "INSERT OR REPLACE INTO users (id, name, email, age) VALUES (?, ?, ?, ?)",
+                user,
+            )
+            for user in users
+        ]
+        await asyncio.gather(*pending)
+        print(f"Write stats: {writes.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(seed_users())
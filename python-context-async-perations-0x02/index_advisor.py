@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+index_advisor.py
+
+Collects the WHERE predicates of queries run through ExecuteQuery, checks
+their plans with EXPLAIN QUERY PLAN, reports full table scans and can
+create the suggested (covering) indexes.
+"""
+
+import re
+import threading
+
+from query_stats import normalize_sql
+
+_TABLE = re.compile(r"\bFROM\s+(\w+)", re.IGNORECASE)
+_SELECTED = re.compile(r"^\s*SELECT\s+(.*?)\s+FROM\b", re.IGNORECASE | re.DOTALL)
+_WHERE = re.compile(
+    r"\bWHERE\s+(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_EQUALITY = re.compile(r"\b(\w+)\s*(?:==?|\bIN\b|\bIS\b)", re.IGNORECASE)
+_RANGE = re.compile(r"\b(\w+)\s*(?:[<>]=?|\bBETWEEN\b|\bLIKE\b)", re.IGNORECASE)
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+_KEYWORDS = {"AND", "OR", "NOT"}
+
+
+class IndexAdvisor:
+    """Suggests indexes for the queries it has observed"""
+
+    def __init__(self):
+        self.queries = {}
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def observe(self, query):
+        """Remember a query that was run, counted by its normalized text"""
+        key = normalize_sql(query)
+        if not _WHERE.search(key):
+            return
+        with self._lock:
+            self.queries[key] = self.queries.get(key, 0) + 1
+
+    def plan(self, connection, query):
+        """EXPLAIN QUERY PLAN details for a normalized query, cached"""
+        plan = self._plans.get(query)
+        if plan is None:
+            params = (None,) * query.count("?")
+            plan = [
+                row[-1]
+                for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", params)
+            ]
+            self._plans[query] = plan
+        return plan
+
+    def report(self, connection):
+        """List the observed queries that scan a whole table
+
+        Each entry holds the query, how often it was seen, its plan and the
+        CREATE INDEX statement that would let it use an index instead.
+        """
+        with self._lock:
+            observed = sorted(self.queries.items(), key=lambda item: -item[1])
+        report = []
+        for query, calls in observed:
+            plan = self.plan(connection, query)
+            scanned = {
+                match.group(1)
+                for match in map(_FULL_SCAN.match, plan)
+                if match
+            }
+            table = _TABLE.search(query)
+            if not table or table.group(1) not in scanned:
+                continue
+            columns = suggest_columns(query)
+            if not columns:
+                continue
+            report.append({
+                "query": query,
+                "calls": calls,
+                "plan": plan,
+                "table": table.group(1),
+                "columns": columns,
+                "suggestion": create_index_sql(table.group(1), columns),
+            })
+        return report
+
+    def apply(self, connection, report=None):
+        """Create the suggested indexes and return the statements run"""
+        if report is None:
+            report = self.report(connection)
+        statements = list(dict.fromkeys(entry["suggestion"] for entry in report))
+        for statement in statements:
+            connection.execute(statement)
+        connection.commit()
+        # Plans change once the indexes exist
+        self._plans.clear()
+        return statements
+
+
+def suggest_columns(query):
+    """Index columns for a query: equality, then one range, then selected
+
+    Equality columns come first so the index can seek on them, followed by
+    the first range column. Explicitly selected columns are appended so the
+    index covers the query and the table itself is never read.
+    """
+    where = _WHERE.search(query)
+    if not where:
+        return []
+    predicate = where.group(1)
+    columns = [
+        c for c in dict.fromkeys(_EQUALITY.findall(predicate))
+        if c.upper() not in _KEYWORDS
+    ]
+    ranges = [
+        c for c in _RANGE.findall(predicate)
+        if c not in columns and c.upper() not in _KEYWORDS
+    ]
+    columns.extend(ranges[:1])
+    if not columns:
+        return []
+
+    selected = _SELECTED.search(query)
+    if selected and selected.group(1).strip() != "*":
+        for column in selected.group(1).split(","):
+            column = column.strip()
+            if re.fullmatch(r"\w+", column) and column not in columns:
+                columns.append(column)
+    return columns
+
+
+def create_index_sql(table, columns):
+    """CREATE INDEX statement for the given table and columns"""
+    name = "idx_{}_{}".format(table, "_".join(columns))
+    return "CREATE INDEX IF NOT EXISTS {} ON {} ({})".format(
+        name, table, ", ".join(columns)
+    )
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+query_engine.py
+
+One query engine for both the sync and async code paths:
+- QueryEngine: async core with a connection pool, single-flight read
+  cache (SingleFlight) and optional QueryStats; the fetch helpers of
+  3-concurrent.py run on it
+- AsyncExecuteQuery: async context manager streaming rows with `async for`
+- SyncQueryEngine: blocking facade driving a QueryEngine from a dedicated
+  background event loop; ExecuteQuery from 1-execute.py runs on it
+"""
+
+import asyncio
+import re
+import threading
+import time
+
+import aiosqlite
+
+_WRITE = re.compile(r"\b(?:INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+def is_read(query):
+    """Whether a query only reads, and so may be coalesced and cached
+
+    A WITH clause may front an INSERT, UPDATE or DELETE, so statements
+    mentioning one of those are treated as writes.
+    """
+    return query.lstrip().upper().startswith(
+        ("SELECT", "WITH")
+    ) and not _WRITE.search(query)
+
+
+class SingleFlight:
+    """Share one execution between identical concurrent queries.
+
+    `execute(query, params)` is the coroutine function running a query.
+    Calls to `fetch` with the same (query, params) while an execution is in
+    flight wait for that execution instead of starting their own. With a
+    `ttl` (seconds) the result is also served from memory for that long.
+    """
+
+    def __init__(self, execute, ttl=0):
+        self.execute = execute
+        self.ttl = ttl
+        self._in_flight = {}
+        self._cache = {}
+        self._generation = 0
+        self.stats = {"executed": 0, "coalesced": 0, "cache_hits": 0}
+
+    async def fetch(self, query, params=()):
+        """Return the rows for query, joining an identical in-flight call"""
+        key = (query, tuple(params))
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires_at, results = cached
+            if expires_at > time.monotonic():
+                self.stats["cache_hits"] += 1
+                return list(results)
+            del self._cache[key]
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.execute(query, params))
+            generation = self._generation
+            future.add_done_callback(
+                lambda done: self._settle(key, done, generation)
+            )
+            self._in_flight[key] = future
+            self.stats["executed"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        # Shield so one caller being cancelled does not cancel the others
+        return list(await asyncio.shield(future))
+
+    def _settle(self, key, future, generation):
+        """Forget the finished execution and cache its result if enabled
+
+        Results of executions started before the last clear() are not
+        cached, since they may predate the change that triggered it.
+        """
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if (
+            self.ttl
+            and generation == self._generation
+            and not future.cancelled()
+            and future.exception() is None
+        ):
+            self._cache[key] = (time.monotonic() + self.ttl, future.result())
+
+    def clear(self):
+        """Drop every cached result and stop joining in-flight executions"""
+        self._generation += 1
+        self._cache.clear()
+        self._in_flight.clear()
+
+
+class ConnectionPool:
+    """Bounded pool of aiosqlite connections, opened on demand"""
+
+    def __init__(self, db_path="users.db", size=5, stats=None):
+        self.db_path = db_path
+        self.size = size
+        self.stats = stats
+        self._idle = asyncio.Queue()
+        self._opened = 0
+        self._connections = []
+
+    async def acquire(self):
+        """Take an idle connection, open a new one, or wait for a release"""
+        if self._idle.empty() and self._opened < self.size:
+            self._opened += 1
+            start = time.perf_counter()
+            try:
+                connection = await aiosqlite.connect(self.db_path)
+            except BaseException:
+                self._opened -= 1
+                raise
+            if self.stats is not None:
+                self.stats.record_connect(time.perf_counter() - start)
+            self._connections.append(connection)
+            return connection
+        return await self._idle.get()
+
+    def release(self, connection):
+        """Hand a connection back to the pool"""
+        self._idle.put_nowait(connection)
+
+    async def close(self):
+        """Close every connection the pool opened"""
+        for connection in self._connections:
+            await connection.close()
+        self._connections.clear()
+        self._idle = asyncio.Queue()
+        self._opened = 0
+
+
+class AsyncExecuteQuery:
+    """Async context manager running one query on a pooled connection
+
+    async with engine.execute("SELECT * FROM users WHERE age > ?", (25,)) as rows:
+        async for row in rows:
+            print(row)
+    """
+
+    def __init__(self, engine, query, params=(), batch_size=100):
+        self.engine = engine
+        self.query = query
+        self.params = params or ()
+        self.batch_size = batch_size
+        self.connection = None
+        self.cursor = None
+        self._execute_time = 0.0
+        self._fetch_time = 0.0
+        self._rows = 0
+
+    async def __aenter__(self):
+        """Enter the context - borrow a connection and execute the query"""
+        self.connection = await self.engine.pool.acquire()
+        try:
+            start = time.perf_counter()
+            self.cursor = await self.connection.execute(self.query, self.params)
+            self._execute_time = time.perf_counter() - start
+        except BaseException:
+            await self._release(failed=True)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Exit the context - finish the statement and return the connection"""
+        await self.cursor.close()
+        await self._release(failed=exc_type is not None)
+        await self._report()
+
+    def __aiter__(self):
+        return self._stream()
+
+    async def _stream(self):
+        while True:
+            batch = await self.fetchmany()
+            if not batch:
+                return
+            for row in batch:
+                yield row
+
+    async def fetchmany(self, size=None):
+        """Fetch the next batch of rows"""
+        start = time.perf_counter()
+        rows = await self.cursor.fetchmany(size or self.batch_size)
+        self._fetch_time += time.perf_counter() - start
+        self._rows += len(rows)
+        return rows
+
+    async def fetchall(self):
+        """Fetch all remaining rows"""
+        start = time.perf_counter()
+        rows = await self.cursor.fetchall()
+        self._fetch_time += time.perf_counter() - start
+        self._rows += len(rows)
+        return rows
+
+    async def _release(self, failed):
+        """Commit or roll back any open transaction, then release"""
+        if self.connection.in_transaction:
+            if failed:
+                await self.connection.rollback()
+            else:
+                await self.connection.commit()
+        self.engine.pool.release(self.connection)
+        if not is_read(self.query):
+            # Cached reads may no longer match the database
+            self.engine.flight.clear()
+
+    async def _report(self):
+        """Send this query's timings to the engine's stats, if any"""
+        stats = self.engine.stats
+        if stats is None:
+            return
+        stats.record(self.query, self._execute_time, self._fetch_time, self._rows)
+        total = self._execute_time + self._fetch_time
+        if stats.is_slow(total):
+            plan = await self.engine.explain(self.query, self.params)
+            stats.add_slow(self.query, self.params, total, plan)
+
+
+class QueryEngine:
+    """Async query engine shared by the async and sync code paths
+
+    Reads issued through fetchall are coalesced with identical in-flight
+    reads, and kept for `cache_ttl` seconds when it is set.
+    """
+
+    def __init__(self, db_path="users.db", pool_size=5, cache_ttl=0, stats=None):
+        self.stats = stats
+        self.pool = ConnectionPool(db_path, pool_size, stats)
+        self.flight = SingleFlight(self._fetchall, ttl=cache_ttl)
+
+    def execute(self, query, params=(), batch_size=100):
+        """Return an AsyncExecuteQuery for streaming the query's rows"""
+        return AsyncExecuteQuery(self, query, params, batch_size)
+
+    async def fetchall(self, query, params=()):
+        """Run a query and return all its rows"""
+        if is_read(query):
+            return await self.flight.fetch(query, params or ())
+        return await self._fetchall(query, params)
+
+    async def _fetchall(self, query, params):
+        async with self.execute(query, params) as result:
+            return await result.fetchall()
+
+    async def explain(self, query, params=()):
+        """Return the EXPLAIN QUERY PLAN details for a query"""
+        connection = await self.pool.acquire()
+        try:
+            rows = await connection.execute_fetchall(
+                f"EXPLAIN QUERY PLAN {query}", params or ()
+            )
+            return [row[-1] for row in rows]
+        except Exception as exc:
+            return [f"unavailable: {exc}"]
+        finally:
+            self.pool.release(connection)
+
+    async def close(self):
+        """Close the pooled connections"""
+        self.flight.clear()
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class SyncQueryEngine:
+    """Blocking facade over a QueryEngine running on a background loop
+
+    Works as a drop-in for ExecuteQuery:
+
+    with SyncQueryEngine("users.db") as executor:
+        results = executor.execute_query("SELECT * FROM users WHERE age > ?", (25,))
+    """
+
+    def __init__(self, db_path="users.db", pool_size=5, cache_ttl=0, stats=None):
+        self.engine = QueryEngine(db_path, pool_size, cache_ttl, stats)
+        self.results = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="query-engine", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self):
+        """Enter the context - the engine is already running"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit the context - close the pool and stop the loop"""
+        self.close()
+
+    def run(self, coro):
+        """Run a coroutine on the engine's loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def execute_query(self, query, params=None):
+        """Execute the query and store results"""
+        self.results = self.run(self.engine.fetchall(query, params or ()))
+        return self.results
+
+    def iterate(self, query, params=(), batch_size=100):
+        """Yield rows one at a time, fetching them in batches"""
+        result = self.engine.execute(query, params, batch_size)
+        self.run(result.__aenter__())
+        try:
+            while True:
+                batch = self.run(result.fetchmany())
+                if not batch:
+                    break
+                yield from batch
+        except BaseException as exc:
+            self.run(result.__aexit__(type(exc), exc, exc.__traceback__))
+            raise
+        else:
+            self.run(result.__aexit__(None, None, None))
+
+    def close(self):
+        """Close the engine and stop the background loop"""
+        if self._loop.is_closed():
+            return
+        self.run(self.engine.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
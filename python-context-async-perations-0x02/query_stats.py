@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+query_stats.py
+
+Opt-in query instrumentation shared by the context managers:
+- per-query connect / execute / fetch timings and row counts
+- aggregation keyed on normalized SQL text
+- a slow-query log with the EXPLAIN QUERY PLAN of each slow query
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query):
+    """Collapse whitespace and replace literals with ? so variants group"""
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class QueryStats:
+    """Collects timings for the queries run through an instrumented cursor"""
+
+    def __init__(self, slow_query_threshold=0.1, slow_log_size=100):
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_queries = deque(maxlen=slow_log_size)
+        self.connections = 0
+        self.connect_time = 0.0
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def record_connect(self, seconds):
+        """Record the time taken to open one connection"""
+        with self._lock:
+            self.connections += 1
+            self.connect_time += seconds
+
+    def record(self, query, execute_time, fetch_time, rows):
+        """Add one query run to the totals for its normalized text"""
+        key = normalize_sql(query)
+        total = execute_time + fetch_time
+        with self._lock:
+            entry = self._queries.get(key)
+            if entry is None:
+                entry = self._queries[key] = {
+                    "calls": 0,
+                    "rows": 0,
+                    "execute_time": 0.0,
+                    "fetch_time": 0.0,
+                    "max_time": 0.0,
+                }
+            entry["calls"] += 1
+            entry["rows"] += rows
+            entry["execute_time"] += execute_time
+            entry["fetch_time"] += fetch_time
+            entry["max_time"] = max(entry["max_time"], total)
+
+    def is_slow(self, seconds):
+        """Whether a query taking `seconds` belongs in the slow-query log"""
+        return (
+            self.slow_query_threshold is not None
+            and seconds >= self.slow_query_threshold
+        )
+
+    def log_slow(self, connection, query, params, seconds):
+        """Log a slow query together with its query plan"""
+        try:
+            plan = [
+                row[-1]
+                for row in connection.execute(
+                    f"EXPLAIN QUERY PLAN {query}", params or ()
+                )
+            ]
+        except Exception as exc:
+            plan = [f"unavailable: {exc}"]
+        self.add_slow(query, params, seconds, plan)
+
+    def add_slow(self, query, params, seconds, plan):
+        """Add an entry whose plan was already captured to the slow log"""
+        entry = {
+            "query": normalize_sql(query),
+            "params": params,
+            "seconds": seconds,
+            "plan": plan,
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+        logger.warning(
+            "slow query (%.3fs): %s | plan: %s",
+            seconds, entry["query"], "; ".join(plan),
+        )
+
+    def snapshot(self):
+        """Per-query totals, hottest (most total time) first"""
+        with self._lock:
+            items = [(key, dict(entry)) for key, entry in self._queries.items()]
+        for _, entry in items:
+            entry["total_time"] = entry["execute_time"] + entry["fetch_time"]
+            entry["avg_time"] = entry["total_time"] / entry["calls"]
+        items.sort(key=lambda item: item[1]["total_time"], reverse=True)
+        return dict(items)
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._queries.clear()
+            self.slow_queries.clear()
+            self.connections = 0
+            self.connect_time = 0.0
+
+
+class TimedCursor:
+    """Cursor wrapper that reports execute/fetch timings to a QueryStats.
+
+    A statement is reported once its results are exhausted, or when the
+    next statement is executed or the cursor is closed.
+    """
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._query = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def execute(self, query, params=()):
+        """Execute a query, timing the statement itself"""
+        self._flush()
+        start = time.perf_counter()
+        self._cursor.execute(query, params)
+        self._execute_time = time.perf_counter() - start
+        self._fetch_time = 0.0
+        self._rows = 0
+        self._query = query
+        self._params = params
+        return self
+
+    def fetchall(self):
+        """Fetch the remaining rows, timing the fetch"""
+        rows = self._timed(self._cursor.fetchall)
+        self._rows += len(rows)
+        self._flush()
+        return rows
+
+    def fetchmany(self, size=None):
+        """Fetch up to `size` rows, timing the fetch"""
+        rows = self._timed(self._cursor.fetchmany, size or self._cursor.arraysize)
+        self._rows += len(rows)
+        return rows
+
+    def fetchone(self):
+        """Fetch the next row, timing the fetch"""
+        row = self._timed(self._cursor.fetchone)
+        if row is None:
+            self._flush()
+        else:
+            self._rows += 1
+        return row
+
+    def close(self):
+        """Report any pending statement and close the cursor"""
+        self._flush()
+        self._cursor.close()
+
+    def _timed(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        self._fetch_time += time.perf_counter() - start
+        return result
+
+    def _flush(self):
+        """Report the current statement, if any, to the stats collector"""
+        if self._query is None:
+            return
+        query, self._query = self._query, None
+        self._stats.record(query, self._execute_time, self._fetch_time, self._rows)
+        total = self._execute_time + self._fetch_time
+        if self._stats.is_slow(total):
+            self._stats.log_slow(self._cursor.connection, query, self._params, total)
+
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Unit tests for the bounded gather helpers of 3-concurrent"""
+
+import asyncio
+import inspect
+import unittest
+
+concurrent = __import__("3-concurrent")
+
+
+class Tracker:
+    """Counts how many tracked coroutines are running at once"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.cancelled = 0
+
+    async def work(self, value, delay=0.01):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(delay)
+            return value
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+
+
+async def fail(delay=0.0):
+    await asyncio.sleep(delay)
+    raise ValueError("boom")
+
+
+class TestGatherBounded(unittest.IsolatedAsyncioTestCase):
+    """Test cases for gather_bounded"""
+
+    async def test_results_keep_order(self):
+        """Test that results come back in the order of the awaitables"""
+        tracker = Tracker()
+        results = await concurrent.gather_bounded(
+            *(tracker.work(i, delay=0.01 * (5 - i)) for i in range(5)), limit=5
+        )
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+
+    async def test_limit(self):
+        """Test that no more than `limit` awaitables run at once"""
+        tracker = Tracker()
+        results = await concurrent.gather_bounded(
+            *(tracker.work(i) for i in range(10)), limit=3
+        )
+        self.assertEqual(results, list(range(10)))
+        self.assertEqual(tracker.peak, 3)
+
+    async def test_failure_cancels_siblings(self):
+        """Test that a failure cancels the running and queued awaitables"""
+        tracker = Tracker()
+        aws = [fail(0.01)] + [tracker.work(i, delay=1) for i in range(4)]
+
+        with self.assertRaises(ValueError):
+            await concurrent.gather_bounded(*aws, limit=2)
+
+        self.assertEqual(tracker.running, 0)
+        self.assertGreater(tracker.cancelled, 0)
+        # Including those still waiting for a slot, which never ran
+        for aw in aws:
+            self.assertEqual(inspect.getcoroutinestate(aw), inspect.CORO_CLOSED)
+
+    async def test_timeout(self):
+        """Test that each awaitable gets its own timeout"""
+        tracker = Tracker()
+        with self.assertRaises(asyncio.TimeoutError):
+            await concurrent.gather_bounded(
+                tracker.work(1, delay=1), timeout=0.01
+            )
+        self.assertEqual(tracker.running, 0)
+
+
+class TestAsCompletedBounded(unittest.IsolatedAsyncioTestCase):
+    """Test cases for as_completed_bounded"""
+
+    async def test_yields_in_completion_order(self):
+        """Test that results are yielded as they complete"""
+        tracker = Tracker()
+        aws = [tracker.work(i, delay=0.01 * (3 - i)) for i in range(3)]
+        results = [
+            result
+            async for result in concurrent.as_completed_bounded(aws, limit=3)
+        ]
+        self.assertEqual(results, [2, 1, 0])
+
+    async def test_limit(self):
+        """Test that no more than `limit` awaitables run at once"""
+        tracker = Tracker()
+        aws = [tracker.work(i) for i in range(6)]
+        results = [
+            result
+            async for result in concurrent.as_completed_bounded(aws, limit=2)
+        ]
+        self.assertEqual(sorted(results), list(range(6)))
+        self.assertEqual(tracker.peak, 2)
+
+    async def test_stopping_early_cancels_the_rest(self):
+        """Test that leaving the iteration early cancels what is left"""
+        tracker = Tracker()
+        aws = [tracker.work(0, delay=0.01)] + [
+            tracker.work(i, delay=1) for i in range(1, 4)
+        ]
+        results = concurrent.as_completed_bounded(aws, limit=4)
+        async for result in results:
+            break
+        await results.aclose()
+
+        self.assertEqual(result, 0)
+        self.assertEqual(tracker.running, 0)
+        self.assertEqual(tracker.cancelled, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
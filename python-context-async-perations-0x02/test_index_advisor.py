@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Unit tests for index_advisor module"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from index_advisor import IndexAdvisor, create_index_sql, suggest_columns
+
+ExecuteQuery = __import__("1-execute").ExecuteQuery
+
+
+class TestSuggestColumns(unittest.TestCase):
+    """Test cases for suggest_columns and create_index_sql"""
+
+    @parameterized.expand(
+        [
+            ("SELECT * FROM users WHERE age > ?", ["age"]),
+            ("SELECT * FROM users WHERE age > ? AND name = ?", ["name", "age"]),
+            ("SELECT name FROM users WHERE age BETWEEN ? AND ?", ["age", "name"]),
+            (
+                "SELECT id, email FROM users WHERE name = ? ORDER BY age",
+                ["name", "id", "email"],
+            ),
+            ("SELECT * FROM users", []),
+        ]
+    )
+    def test_suggest_columns(self, query, expected):
+        """Test equality columns first, then one range, then selected"""
+        self.assertEqual(suggest_columns(query), expected)
+
+    def test_create_index_sql(self):
+        """Test the CREATE INDEX statement built for columns"""
+        self.assertEqual(
+            create_index_sql("users", ["name", "age"]),
+            "CREATE INDEX IF NOT EXISTS idx_users_name_age ON users (name, age)",
+        )
+
+
+class TestIndexAdvisor(unittest.TestCase):
+    """Test cases for IndexAdvisor"""
+
+    def setUp(self):
+        """Create a users table without secondary indexes"""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.db_path = os.path.join(tmpdir.name, "users.db")
+        self.connection = sqlite3.connect(self.db_path)
+        self.addCleanup(self.connection.close)
+        self.connection.execute(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)"
+        )
+        self.connection.commit()
+        self.advisor = IndexAdvisor()
+
+    def test_observe_counts_normalized_queries(self):
+        """Test that only filtered queries are counted, by normalized text"""
+        self.advisor.observe("SELECT * FROM users WHERE age > 25")
+        self.advisor.observe("SELECT * FROM users WHERE age >  40")
+        self.advisor.observe("SELECT * FROM users")
+        self.assertEqual(
+            self.advisor.queries, {"SELECT * FROM users WHERE age > ?": 2}
+        )
+
+    def test_report_full_scans(self):
+        """Test that scans are reported and primary key lookups are not"""
+        self.advisor.observe("SELECT name FROM users WHERE age > 30")
+        self.advisor.observe("SELECT * FROM users WHERE id = 1")
+
+        entry, = self.advisor.report(self.connection)
+
+        self.assertEqual(entry["query"], "SELECT name FROM users WHERE age > ?")
+        self.assertEqual(entry["calls"], 1)
+        self.assertEqual(entry["table"], "users")
+        self.assertEqual(entry["columns"], ["age", "name"])
+
+    def test_apply_creates_covering_index(self):
+        """Test that applied suggestions remove the full scans"""
+        self.advisor.observe("SELECT name FROM users WHERE age > 30")
+        self.advisor.observe("SELECT name FROM users WHERE age > 40")
+
+        statements = self.advisor.apply(self.connection)
+
+        self.assertEqual(statements, [
+            "CREATE INDEX IF NOT EXISTS idx_users_age_name ON users (age, name)"
+        ])
+        self.assertEqual(self.advisor.report(self.connection), [])
+        plan, = self.advisor.plan(
+            self.connection, "SELECT name FROM users WHERE age > ?"
+        )
+        self.assertIn("COVERING INDEX idx_users_age_name", plan)
+
+    def test_fed_by_execute_query(self):
+        """Test that ExecuteQuery passes its queries to the advisor"""
+        with ExecuteQuery(self.db_path, advisor=self.advisor) as executor:
+            executor.execute_query("SELECT * FROM users WHERE age > ?", (25,))
+            executor.execute_query("SELECT * FROM users")
+        self.assertEqual(
+            self.advisor.queries, {"SELECT * FROM users WHERE age > ?": 1}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
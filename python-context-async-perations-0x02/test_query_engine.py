@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""Unit tests for query_engine module"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from query_engine import QueryEngine, SingleFlight, SyncQueryEngine, is_read
+from query_stats import QueryStats
+
+ExecuteQuery = __import__("1-execute").ExecuteQuery
+
+USERS = [(1, "John", 25), (2, "Jane", 30), (3, "Bob", 45)]
+
+
+def create_users_db(tmpdir):
+    """Create a users table in a temporary directory and return its path"""
+    db_path = os.path.join(tmpdir, "users.db")
+    connection = sqlite3.connect(db_path)
+    connection.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)"
+    )
+    connection.executemany("INSERT INTO users VALUES (?, ?, ?)", USERS)
+    connection.commit()
+    connection.close()
+    return db_path
+
+
+class Backend:
+    """Stand-in for a query executor, released on demand"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.error = None
+
+    async def execute(self, query, params):
+        self.calls.append((query, params))
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return [(query, len(self.calls))]
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Test cases for SingleFlight"""
+
+    async def test_identical_calls_share_one_execution(self):
+        """Test that concurrent identical calls run the query once"""
+        backend = Backend()
+        flight = SingleFlight(backend.execute)
+
+        calls = [
+            asyncio.ensure_future(flight.fetch("SELECT 1", (1,)))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        backend.release.set()
+        results = await asyncio.gather(*calls)
+
+        self.assertEqual(backend.calls, [("SELECT 1", (1,))])
+        self.assertEqual(results, [[("SELECT 1", 1)]] * 3)
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(
+            flight.stats, {"executed": 1, "coalesced": 2, "cache_hits": 0}
+        )
+
+    async def test_different_params_run_separately(self):
+        """Test that calls only coalesce on identical query and params"""
+        backend = Backend()
+        backend.release.set()
+        flight = SingleFlight(backend.execute)
+
+        await asyncio.gather(
+            flight.fetch("SELECT ?", (1,)), flight.fetch("SELECT ?", (2,))
+        )
+
+        self.assertEqual(len(backend.calls), 2)
+
+    async def test_no_cache_without_ttl(self):
+        """Test that finished executions are not reused without a ttl"""
+        backend = Backend()
+        backend.release.set()
+        flight = SingleFlight(backend.execute)
+
+        await flight.fetch("SELECT 1")
+        await flight.fetch("SELECT 1")
+
+        self.assertEqual(len(backend.calls), 2)
+
+    async def test_ttl_cache(self):
+        """Test that results are served from memory until they expire"""
+        backend = Backend()
+        backend.release.set()
+        flight = SingleFlight(backend.execute, ttl=10)
+
+        with patch("query_engine.time.monotonic", return_value=100.0):
+            await flight.fetch("SELECT 1")
+            await flight.fetch("SELECT 1")
+        with patch("query_engine.time.monotonic", return_value=111.0):
+            await flight.fetch("SELECT 1")
+
+        self.assertEqual(len(backend.calls), 2)
+        self.assertEqual(flight.stats["cache_hits"], 1)
+
+    async def test_failure_is_shared_and_not_cached(self):
+        """Test that a failure reaches every waiter and is not kept"""
+        backend = Backend()
+        backend.error = ValueError("boom")
+        flight = SingleFlight(backend.execute, ttl=10)
+
+        calls = [
+            asyncio.ensure_future(flight.fetch("SELECT 1")) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        backend.release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        backend.error = None
+        self.assertEqual(await flight.fetch("SELECT 1"), [("SELECT 1", 2)])
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that cancelling one waiter leaves the execution running"""
+        backend = Backend()
+        flight = SingleFlight(backend.execute)
+
+        first = asyncio.ensure_future(flight.fetch("SELECT 1"))
+        second = asyncio.ensure_future(flight.fetch("SELECT 1"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        backend.release.set()
+
+        self.assertEqual(await second, [("SELECT 1", 1)])
+        self.assertTrue(first.cancelled())
+
+    async def test_clear_drops_cached_and_in_flight(self):
+        """Test that executions started before clear are not reused"""
+        backend = Backend()
+        flight = SingleFlight(backend.execute, ttl=10)
+
+        before = asyncio.ensure_future(flight.fetch("SELECT 1"))
+        await asyncio.sleep(0)
+        flight.clear()
+        after = asyncio.ensure_future(flight.fetch("SELECT 1"))
+        await asyncio.sleep(0)
+        backend.release.set()
+        await asyncio.gather(before, after)
+        await flight.fetch("SELECT 1")
+
+        # The second execution is cached, the first one predates clear()
+        self.assertEqual(len(backend.calls), 2)
+        self.assertEqual(flight.stats["cache_hits"], 1)
+
+
+class TestIsRead(unittest.TestCase):
+    """Test cases for is_read"""
+
+    @parameterized.expand(
+        [
+            ("SELECT * FROM users", True),
+            ("  with old AS (SELECT 1) SELECT * FROM old", True),
+            ("INSERT INTO users VALUES (1)", False),
+            ("UPDATE users SET age = 1", False),
+            ("WITH old AS (SELECT id FROM users) DELETE FROM users", False),
+            ("WITH n AS (SELECT 1) UPDATE users SET age = 2", False),
+            ("CREATE TABLE t (id INTEGER)", False),
+        ]
+    )
+    def test_is_read(self, query, expected):
+        """Test which statements count as reads"""
+        self.assertEqual(is_read(query), expected)
+
+
+class TestQueryEngine(unittest.IsolatedAsyncioTestCase):
+    """Test cases for QueryEngine"""
+
+    async def asyncSetUp(self):
+        """Start an engine on a temporary users database"""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.stats = QueryStats(slow_query_threshold=None)
+        self.engine = QueryEngine(
+            create_users_db(tmpdir.name), pool_size=2, cache_ttl=60,
+            stats=self.stats,
+        )
+
+    async def asyncTearDown(self):
+        await self.engine.close()
+
+    async def test_fetchall(self):
+        """Test that fetchall returns the rows of a query"""
+        rows = await self.engine.fetchall(
+            "SELECT id FROM users WHERE age > ?", (26,)
+        )
+        self.assertEqual(rows, [(2,), (3,)])
+
+    async def test_stream_rows(self):
+        """Test that execute streams rows in batches"""
+        async with self.engine.execute(
+            "SELECT id FROM users", batch_size=2
+        ) as result:
+            self.assertEqual(len(await result.fetchmany()), 2)
+            rows = [row async for row in result]
+        self.assertEqual(rows, [(3,)])
+        self.assertEqual(self.stats.snapshot()["SELECT id FROM users"]["rows"], 3)
+
+    async def test_pool_bounded(self):
+        """Test that concurrent queries never open more than pool_size"""
+        await asyncio.gather(*(
+            self.engine.fetchall("SELECT * FROM users WHERE id = ?", (i,))
+            for i in range(6)
+        ))
+        self.assertEqual(self.stats.connections, 2)
+
+    async def test_reads_cached(self):
+        """Test that repeated reads are served from the cache"""
+        for _ in range(3):
+            await self.engine.fetchall("SELECT * FROM users")
+        self.assertEqual(self.engine.flight.stats["executed"], 1)
+        self.assertEqual(self.engine.flight.stats["cache_hits"], 2)
+
+    async def test_write_clears_cached_reads(self):
+        """Test that a write through the engine drops stale cached reads"""
+        query = "SELECT age FROM users WHERE id = ?"
+        self.assertEqual(await self.engine.fetchall(query, (1,)), [(25,)])
+
+        await self.engine.fetchall("UPDATE users SET age = 26 WHERE id = 1")
+
+        self.assertEqual(await self.engine.fetchall(query, (1,)), [(26,)])
+
+    async def test_cte_write_not_cached(self):
+        """Test that a write behind a WITH clause is not cached as a read"""
+        delete = (
+            "WITH old AS (SELECT id FROM users WHERE age > ?) "
+            "DELETE FROM users WHERE id IN old"
+        )
+        await self.engine.fetchall(delete, (40,))
+        await self.engine.fetchall("INSERT INTO users VALUES (3, 'Bob', 45)")
+        await self.engine.fetchall(delete, (40,))
+
+        self.assertEqual(
+            await self.engine.fetchall("SELECT id FROM users"), [(1,), (2,)]
+        )
+
+    async def test_failed_write_rolled_back(self):
+        """Test that a failing statement rolls back and frees its connection"""
+        with self.assertRaises(sqlite3.IntegrityError):
+            await self.engine.fetchall(
+                "INSERT INTO users VALUES (1, 'Again', 1)"
+            )
+        rows = await self.engine.fetchall("SELECT COUNT(*) FROM users")
+        self.assertEqual(rows, [(3,)])
+
+    async def test_explain(self):
+        """Test that explain returns the query plan details"""
+        plan = await self.engine.explain("SELECT * FROM users WHERE age > ?", (1,))
+        self.assertTrue(plan[0].startswith("SCAN"))
+        plan = await self.engine.explain("SELECT * FROM missing")
+        self.assertTrue(plan[0].startswith("unavailable"))
+
+
+class TestSyncQueryEngine(unittest.TestCase):
+    """Test cases for SyncQueryEngine and ExecuteQuery"""
+
+    def setUp(self):
+        """Create a temporary users database"""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.db_path = create_users_db(tmpdir.name)
+
+    def test_execute_query(self):
+        """Test that execute_query returns and stores the rows"""
+        with SyncQueryEngine(self.db_path) as executor:
+            results = executor.execute_query(
+                "SELECT name FROM users WHERE age > ?", (25,)
+            )
+        self.assertEqual(results, [("Jane",), ("Bob",)])
+        self.assertEqual(executor.results, results)
+
+    def test_iterate(self):
+        """Test that iterate yields every row across batches"""
+        with SyncQueryEngine(self.db_path) as executor:
+            rows = list(executor.iterate("SELECT id FROM users", batch_size=2))
+        self.assertEqual(rows, [(1,), (2,), (3,)])
+
+    def test_write_clears_cached_reads(self):
+        """Test that cached reads see writes made through the engine"""
+        with SyncQueryEngine(self.db_path, cache_ttl=60) as executor:
+            query = "SELECT COUNT(*) FROM users"
+            self.assertEqual(executor.execute_query(query), [(3,)])
+            executor.execute_query("DELETE FROM users WHERE id = 1")
+            self.assertEqual(executor.execute_query(query), [(2,)])
+
+    def test_close_twice(self):
+        """Test that closing an already closed engine does nothing"""
+        executor = SyncQueryEngine(self.db_path)
+        executor.close()
+        executor.close()
+        self.assertFalse(executor._thread.is_alive())
+
+    def test_execute_query_context_manager(self):
+        """Test that ExecuteQuery runs on one pooled connection"""
+        stats = QueryStats(slow_query_threshold=None)
+        with ExecuteQuery(self.db_path, stats=stats) as executor:
+            for age in (20, 40):
+                executor.execute_query(
+                    "SELECT id FROM users WHERE age > ?", (age,)
+                )
+        self.assertEqual(executor.results, [(3,)])
+        self.assertEqual(stats.connections, 1)
+        entry, = stats.snapshot().values()
+        self.assertEqual(entry["calls"], 2)
+
+    def test_execute_query_shares_engine(self):
+        """Test that ExecuteQuery blocks share a given engine's cache"""
+        query = "SELECT name FROM users WHERE age > ?"
+        with SyncQueryEngine(self.db_path, cache_ttl=60) as engine:
+            for _ in range(2):
+                with ExecuteQuery(engine=engine) as executor:
+                    results = executor.execute_query(query, (40,))
+                self.assertIs(executor.engine, engine)
+
+            self.assertEqual(results, [("Bob",)])
+            self.assertEqual(engine.engine.flight.stats["executed"], 1)
+            self.assertEqual(engine.engine.flight.stats["cache_hits"], 1)
+            # Still open after the blocks
+            self.assertEqual(engine.execute_query("SELECT COUNT(*) FROM users"), [(3,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Unit tests for query_stats module"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from query_stats import QueryStats, TimedCursor, normalize_sql
+
+
+class TestNormalizeSql(unittest.TestCase):
+    """Test cases for normalize_sql"""
+
+    def test_literals_and_whitespace(self):
+        """Test that literals become ? and whitespace collapses"""
+        self.assertEqual(
+            normalize_sql("SELECT *\n  FROM users WHERE age > 25 AND name = 'O''Neil'"),
+            "SELECT * FROM users WHERE age > ? AND name = ?",
+        )
+
+    def test_identifiers_with_digits_kept(self):
+        """Test that digits inside identifiers are not replaced"""
+        self.assertEqual(normalize_sql("SELECT col1 FROM t2"), "SELECT col1 FROM t2")
+
+
+class TestQueryStats(unittest.TestCase):
+    """Test cases for QueryStats"""
+
+    def test_record_groups_by_normalized_query(self):
+        """Test that variants of a query add up in one entry"""
+        stats = QueryStats()
+        stats.record("SELECT * FROM users WHERE age > 25", 0.1, 0.2, 3)
+        stats.record("SELECT * FROM users  WHERE age > 40", 0.3, 0.0, 1)
+        stats.record("SELECT 1", 0.0, 0.0, 1)
+
+        snapshot = stats.snapshot()
+        self.assertEqual(
+            list(snapshot),
+            ["SELECT * FROM users WHERE age > ?", "SELECT ?"],
+        )
+        entry = snapshot["SELECT * FROM users WHERE age > ?"]
+        self.assertEqual(entry["calls"], 2)
+        self.assertEqual(entry["rows"], 4)
+        self.assertAlmostEqual(entry["total_time"], 0.6)
+        self.assertAlmostEqual(entry["avg_time"], 0.3)
+        self.assertAlmostEqual(entry["max_time"], 0.3)
+
+    def test_is_slow(self):
+        """Test the slow query threshold, which None disables"""
+        self.assertTrue(QueryStats(0.1).is_slow(0.1))
+        self.assertFalse(QueryStats(0.1).is_slow(0.05))
+        self.assertFalse(QueryStats(None).is_slow(100))
+
+    def test_slow_log_bounded(self):
+        """Test that the slow log keeps only the latest entries"""
+        stats = QueryStats(slow_log_size=2)
+        with self.assertLogs("query_stats", "WARNING"):
+            for i in range(3):
+                stats.add_slow(f"SELECT {i}", (), 1.0, ["SCAN t"])
+        self.assertEqual(len(stats.slow_queries), 2)
+        self.assertEqual(stats.slow_queries[0]["plan"], ["SCAN t"])
+
+    def test_reset(self):
+        """Test that reset forgets everything"""
+        stats = QueryStats()
+        stats.record_connect(0.5)
+        stats.record("SELECT 1", 0.0, 0.0, 1)
+        stats.reset()
+        self.assertEqual(stats.snapshot(), {})
+        self.assertEqual(stats.connections, 0)
+        self.assertEqual(stats.connect_time, 0.0)
+
+
+class TestTimedCursor(unittest.TestCase):
+    """Test cases for TimedCursor"""
+
+    def setUp(self):
+        """Open a users table in a temporary database"""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.connection = sqlite3.connect(os.path.join(tmpdir.name, "users.db"))
+        self.addCleanup(self.connection.close)
+        self.connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, age INTEGER)")
+        self.connection.executemany(
+            "INSERT INTO users (age) VALUES (?)", [(20,), (30,), (40,)]
+        )
+        self.stats = QueryStats(slow_query_threshold=None)
+        self.cursor = TimedCursor(self.connection.cursor(), self.stats)
+
+    def test_fetchall_reports_statement(self):
+        """Test that a statement is reported once fetchall exhausts it"""
+        query = "SELECT * FROM users WHERE age > ?"
+        rows = self.cursor.execute(query, (25,)).fetchall()
+
+        self.assertEqual(len(rows), 2)
+        entry = self.stats.snapshot()[query]
+        self.assertEqual((entry["calls"], entry["rows"]), (1, 2))
+
+    def test_fetchmany_reported_on_next_execute(self):
+        """Test that a partly read statement is reported by the next one"""
+        self.cursor.execute("SELECT * FROM users")
+        self.assertEqual(len(self.cursor.fetchmany(2)), 2)
+        self.assertEqual(self.stats.snapshot(), {})
+
+        self.cursor.execute("SELECT 1")
+        self.assertEqual(self.stats.snapshot()["SELECT * FROM users"]["rows"], 2)
+
+    def test_iteration_and_close(self):
+        """Test iterating rows, and close reporting a pending statement"""
+        self.cursor.execute("SELECT * FROM users")
+        self.assertEqual(len(list(self.cursor)), 3)
+        self.cursor.execute("SELECT age FROM users")
+        self.cursor.fetchone()
+        self.cursor.close()
+
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["SELECT * FROM users"]["rows"], 3)
+        self.assertEqual(snapshot["SELECT age FROM users"]["rows"], 1)
+
+    def test_slow_query_logged_with_plan(self):
+        """Test that a slow statement is logged with its query plan"""
+        self.stats.slow_query_threshold = 0.5
+        with patch("query_stats.time.perf_counter", side_effect=[0.0, 1.0, 1.0, 1.0]):
+            with self.assertLogs("query_stats", "WARNING"):
+                self.cursor.execute("SELECT * FROM users WHERE age > ?", (25,))
+                self.cursor.fetchall()
+
+        entry, = self.stats.slow_queries
+        self.assertEqual(entry["params"], (25,))
+        self.assertEqual(entry["seconds"], 1.0)
+        self.assertTrue(entry["plan"][0].startswith("SCAN"))
+
+    def test_passes_other_attributes_through(self):
+        """Test that other cursor attributes come from the wrapped cursor"""
+        self.cursor.execute("UPDATE users SET age = age + 1")
+        self.assertEqual(self.cursor.rowcount, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
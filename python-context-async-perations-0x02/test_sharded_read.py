@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Unit tests for the ShardedQuery of 4-sharded_read"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+sharded_read = __import__("4-sharded_read")
+
+
+class TestShardedQuery(unittest.TestCase):
+    """Test cases for ShardedQuery"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create a users table with gaps in its rowids"""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.db_path = os.path.join(cls.tmpdir.name, "users.db")
+        connection = sqlite3.connect(cls.db_path)
+        connection.execute(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)"
+        )
+        connection.executemany(
+            "INSERT INTO users (id, name, age) VALUES (?, ?, ?)",
+            [(i, f"user{i}", 20 + i % 40) for i in range(1, 101) if i % 7],
+        )
+        connection.execute("CREATE TABLE empty (id INTEGER PRIMARY KEY)")
+        connection.commit()
+        connection.close()
+        cls.sharded = sharded_read.ShardedQuery(cls.db_path, workers=2)
+        cls.sharded.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the workers and remove the database"""
+        cls.sharded.__exit__(None, None, None)
+        cls.tmpdir.cleanup()
+
+    def expected(self, query, params=()):
+        connection = sqlite3.connect(self.db_path)
+        try:
+            return connection.execute(query, params).fetchall()
+        finally:
+            connection.close()
+
+    def test_rowid_ranges(self):
+        """Test that the ranges cover the rowid span without overlap"""
+        ranges = self.sharded.rowid_ranges(3)
+        self.assertEqual(ranges, [(1, 34), (35, 68), (69, 100)])
+        self.assertEqual(self.sharded.rowid_ranges(500)[-1], (100, 100))
+
+    def test_rowid_ranges_empty_table(self):
+        """Test that an empty table has no ranges"""
+        empty = sharded_read.ShardedQuery(self.db_path, table="empty")
+        self.assertEqual(empty.rowid_ranges(4), [])
+
+    def test_matches_single_query(self):
+        """Test that sharded rows equal one ordered SELECT"""
+        for shards in (1, 3, 8):
+            with self.subTest(shards=shards):
+                self.assertEqual(
+                    self.sharded.execute_query(shards=shards),
+                    self.expected("SELECT * FROM users ORDER BY rowid"),
+                )
+
+    def test_where_and_columns(self):
+        """Test that the filter and column list apply to every shard"""
+        self.assertEqual(
+            self.sharded.execute_query("age > ?", (45,), columns="name"),
+            self.expected(
+                "SELECT name FROM users WHERE age > ? ORDER BY rowid", (45,)
+            ),
+        )
+
+    def test_workers_read_only(self):
+        """Test that the worker connections cannot write"""
+        with self.assertRaises(sqlite3.OperationalError):
+            sharded_read.read_shard(
+                self.db_path, "DELETE FROM users WHERE id = ?", (1,)
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Unit tests for the WriteQueue of 5-write_queue"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+WriteQueue = __import__("5-write_queue").WriteQueue
+
+INSERT = "INSERT INTO users (id, name) VALUES (?, ?)"
+
+
+class TestWriteQueue(unittest.IsolatedAsyncioTestCase):
+    """Test cases for WriteQueue"""
+
+    def setUp(self):
+        """Create an empty users table in a temporary database"""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.db_path = os.path.join(tmpdir.name, "users.db")
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        connection.commit()
+        connection.close()
+
+    def rows(self):
+        connection = sqlite3.connect(self.db_path)
+        try:
+            return connection.execute("SELECT * FROM users ORDER BY id").fetchall()
+        finally:
+            connection.close()
+
+    async def test_writes_batched_into_one_transaction(self):
+        """Test that queued writes commit together"""
+        async with WriteQueue(self.db_path, max_delay=0.1) as writes:
+            pending = [writes.submit(INSERT, (i, f"user{i}")) for i in range(5)]
+            self.assertEqual(await asyncio.gather(*pending), [1] * 5)
+
+        self.assertEqual(len(self.rows()), 5)
+        self.assertEqual(
+            writes.stats, {"writes": 5, "failed": 0, "transactions": 1}
+        )
+
+    async def test_max_batch(self):
+        """Test that a full batch is committed without waiting"""
+        async with WriteQueue(self.db_path, max_batch=2, max_delay=10) as writes:
+            pending = [writes.submit(INSERT, (i, f"user{i}")) for i in range(5)]
+            await asyncio.wait_for(asyncio.gather(*pending[:4]), 0.5)
+
+        self.assertEqual(writes.stats["transactions"], 3)
+
+    async def test_max_delay(self):
+        """Test that a partial batch is committed after max_delay"""
+        async with WriteQueue(self.db_path, max_delay=0.01) as writes:
+            await writes.submit(INSERT, (1, "first"))
+            await writes.submit(INSERT, (2, "second"))
+
+        self.assertEqual(writes.stats["transactions"], 2)
+
+    async def test_failed_write_isolated_by_savepoint(self):
+        """Test that one failing write leaves the rest of its batch"""
+        async with WriteQueue(self.db_path, max_delay=0.1) as writes:
+            pending = [
+                writes.submit(INSERT, (1, "first")),
+                writes.submit(INSERT, (1, "duplicate")),
+                writes.submit(INSERT, (2, "second")),
+            ]
+            results = await asyncio.gather(*pending, return_exceptions=True)
+
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], sqlite3.IntegrityError)
+        self.assertEqual(results[2], 1)
+        self.assertEqual(self.rows(), [(1, "first"), (2, "second")])
+        self.assertEqual(
+            writes.stats, {"writes": 2, "failed": 1, "transactions": 1}
+        )
+
+    async def test_failed_transaction_fails_whole_batch(self):
+        """Test that a failing BEGIN fails every write of the batch"""
+        async with WriteQueue(self.db_path, max_delay=0.1) as writes:
+            # A transaction left open makes the batch's BEGIN fail; the writer
+            # then rolls it back
+            await writes.connection.execute("BEGIN")
+            pending = [writes.submit(INSERT, (i, f"user{i}")) for i in range(2)]
+            results = await asyncio.gather(*pending, return_exceptions=True)
+
+        self.assertTrue(
+            all(isinstance(r, sqlite3.OperationalError) for r in results)
+        )
+        self.assertEqual(self.rows(), [])
+        self.assertEqual(
+            writes.stats, {"writes": 0, "failed": 2, "transactions": 0}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()